@@ -0,0 +1,206 @@
+"""Micro-benchmarks for parsing and querying Forecast.Solar estimates.
+
+Run from the repository root, optionally writing the results as JSON and
+comparing them against the results of an earlier commit:
+
+    python benchmarks/benchmark.py --output after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, cast
+
+from multidict import CIMultiDict
+
+from forecast_solar import (
+    ClearSkyEstimator,
+    Estimate,
+    Plane,
+    Ratelimit,
+    RefreshPlanner,
+)
+from forecast_solar._stream import StreamDecoder
+from forecast_solar.models import _interval_value_sum, _Series, _timed_value
+from forecast_solar.testing import estimate_payload
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from aiohttp import ClientResponse
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+
+
+@dataclass
+class Result:
+    """Timing of a single benchmark, in seconds per call."""
+
+    name: str
+    calls: int
+    best: float
+    median: float
+
+
+def load_fixture(filename: str) -> dict[str, Any]:
+    """Load an API response from the test fixtures."""
+    return json.loads((FIXTURES / filename).read_text())
+
+
+def measure(
+    name: str, func: Callable[[], object], repeat: int, min_time: float
+) -> Result:
+    """Time a function, with enough calls per run to last min_time."""
+    timer = timeit.Timer(func)
+    calls = 1
+    while timer.timeit(calls) < min_time:
+        calls *= 2
+    runs = [duration / calls for duration in timer.repeat(repeat, calls)]
+    return Result(name, calls, min(runs), statistics.median(runs))
+
+
+def stream_decode(body: bytes, chunk_size: int = 65536) -> Estimate:
+    """Decode an estimate response in chunks, like a streamed request."""
+    decoder = StreamDecoder()
+    for position in range(0, len(body), chunk_size):
+        decoder.feed(body[position : position + chunk_size])
+    return Estimate.from_dict(decoder.close())
+
+
+def benchmarks(fleet_size: int) -> Iterator[tuple[str, Callable[[], object]]]:
+    """Yield the name and function of every benchmark."""
+    single = load_fixture("forecast.json")
+    multi = load_fixture("forecast_personal.json")
+    start = datetime.combine(datetime.now(UTC).date(), datetime.min.time(), UTC)
+    quarter = timedelta(minutes=15)
+    week = estimate_payload(start - timedelta(days=1), days=7, step=quarter)
+    fleet = [
+        estimate_payload(start - timedelta(days=1), step=quarter)
+        for _ in range(fleet_size)
+    ]
+
+    yield "from_dict[single_plane]", lambda: Estimate.from_dict(single)
+    yield "from_dict[multi_plane]", lambda: Estimate.from_dict(multi)
+    yield "from_dict[week_15min]", lambda: Estimate.from_dict(week)
+    yield "from_dict[week_15min,lazy]", lambda: Estimate.from_dict(week, lazy=True)
+    body = json.dumps(week).encode()
+    yield "stream_decode[week_15min]", lambda: stream_decode(body)
+    yield (
+        f"from_dict[fleet_{fleet_size}]",
+        lambda: [Estimate.from_dict(data) for data in fleet],
+    )
+
+    estimate = Estimate.from_dict(week)
+    properties = sorted(
+        name for name, value in vars(Estimate).items() if isinstance(value, property)
+    )
+    for name in properties:
+        yield f"property[{name}]", lambda name=name: getattr(estimate, name)
+    yield (
+        "method[day_production]",
+        lambda: estimate.day_production(date.today()),  # noqa: DTZ011
+    )
+    yield "method[snapshot]", estimate.snapshot
+    yield (
+        "method[transform]",
+        lambda: estimate.transform(damping_morning=0.2, inverter=0.6),
+    )
+
+    estimator = ClearSkyEstimator(52.16, 4.47, [Plane(20, 10, 2.16)])
+    yield (
+        "clear_sky[site_day]",
+        lambda: estimator.estimate(date(2024, 4, 26), days=1),
+    )
+
+    planner = RefreshPlanner(call_limit=60, period=3600)
+    for site in range(fleet_size * 50):
+        planner.add(site, max_age=timedelta(minutes=15), priority=1 + site % 3)
+    yield f"planner_next[sites_{fleet_size * 50}]", lambda: planner.next(start)
+
+    series = _Series.from_iso(week["result"]["watts"])
+    now = datetime.now(UTC)
+    yield "timed_value[week_15min]", lambda: _timed_value(now, series)
+    yield (
+        "interval_value_sum[week_15min]",
+        lambda: _interval_value_sum(now, now + timedelta(hours=6), series),
+    )
+
+    response = cast(
+        "ClientResponse",
+        SimpleNamespace(
+            headers=CIMultiDict(
+                {
+                    "X-Ratelimit-Limit": "12",
+                    "X-Ratelimit-Period": "3600",
+                    "X-Ratelimit-Remaining": "11",
+                    "X-Ratelimit-Retry-At": "2024-04-27T02:48:53+02:00",
+                }
+            )
+        ),
+    )
+    yield "ratelimit_from_response", lambda: Ratelimit.from_response(response)
+
+
+def git_commit() -> str | None:
+    """Return the commit the benchmarks run against, if known."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Run the benchmarks and report the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="earlier results to compare")
+    parser.add_argument("--filter", default="", help="only run matching names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--fleet-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        data = json.loads(args.compare.read_text())
+        baseline = {result["name"]: result["best"] for result in data["results"]}
+
+    results = []
+    for name, func in benchmarks(args.fleet_size):
+        if args.filter not in name:
+            continue
+        result = measure(name, func, args.repeat, args.min_time)
+        results.append(result)
+        line = f"{name:48} {result.best * 1e6:14.3f} us"
+        if name in baseline:
+            line += f" {result.best / baseline[name]:8.2f}x"
+        print(line)
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,7 +30,7 @@ async def main() -> None:
             return
 
         # Uncomment this if you want to see what's in the estimate arrays
-        # pprint(dataclasses.asdict(estimate))
+        # pprint(estimate)
         print()
         print(f"energy_production_today: {estimate.energy_production_today}")
         print(
@@ -1,26 +1,62 @@
 """Asynchronous Python client for the Forecast.Solar API."""
 
+from .cache import EstimateCache, PersistentEstimateCache
+from .daylight import DaylightRefresher
 from .exceptions import (
     ForecastSolarAuthenticationError,
+    ForecastSolarCircuitOpenError,
     ForecastSolarConfigError,
     ForecastSolarConnectionError,
     ForecastSolarError,
     ForecastSolarRatelimitError,
     ForecastSolarRequestError,
 )
+from .fleet import FleetResult, ForecastSolarFleet, Site
 from .forecast_solar import ForecastSolar
-from .models import AccountType, Estimate, Plane, Ratelimit
+from .models import (
+    AccountType,
+    DaySummary,
+    Estimate,
+    EstimateSnapshot,
+    Plane,
+    Ratelimit,
+)
+from .observer import MetricsAggregator, RequestMetrics, RequestObserver
+from .planner import PlannedRefresh, RefreshPlanner
+from .retry import CircuitBreaker, RetryPolicy
+from .scheduler import RatelimitScheduler
+from .solar import ClearSkyEstimator
+from .transport import Transport
 
 __all__ = [
     "AccountType",
+    "CircuitBreaker",
+    "ClearSkyEstimator",
+    "DaySummary",
+    "DaylightRefresher",
     "Estimate",
+    "EstimateCache",
+    "EstimateSnapshot",
+    "FleetResult",
     "ForecastSolar",
     "ForecastSolarAuthenticationError",
+    "ForecastSolarCircuitOpenError",
     "ForecastSolarConfigError",
     "ForecastSolarConnectionError",
     "ForecastSolarError",
+    "ForecastSolarFleet",
     "ForecastSolarRatelimitError",
     "ForecastSolarRequestError",
+    "MetricsAggregator",
+    "PersistentEstimateCache",
     "Plane",
+    "PlannedRefresh",
     "Ratelimit",
+    "RatelimitScheduler",
+    "RefreshPlanner",
+    "RequestMetrics",
+    "RequestObserver",
+    "RetryPolicy",
+    "Site",
+    "Transport",
 ]
@@ -0,0 +1,27 @@
+"""Arrow export of estimate series, this requires PyArrow."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from .models import _Series
+
+
+def series_table(series: _Series) -> pa.Table:
+    """Return a series as a table with a timestamp and a value column.
+
+    The columns wrap the typed arrays of the series, no data is copied.
+    Naive timestamps get a timestamp type without timezone.
+    """
+    length = len(series)
+    zone = None if series.naive else "UTC"
+    timestamps = pa.Array.from_buffers(
+        pa.timestamp("s", tz=zone), length, [None, pa.py_buffer(series.timestamps)]
+    )
+    values = pa.Array.from_buffers(
+        pa.int64(), length, [None, pa.py_buffer(series.values)]
+    )
+    return pa.table({"timestamp": timestamps, "value": values})
@@ -0,0 +1,92 @@
+"""Vectorized helpers for estimate series, these require NumPy."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import NDArray
+
+    from .models import _Series
+
+
+def sample_series(
+    series: _Series, boundaries: list[float], *, linear: bool
+) -> tuple[NDArray[Any], NDArray[Any], NDArray[Any]]:
+    """Return timestamps, power and energy of a series on a time grid.
+
+    Computes the same curve and integral as the pure Python sampler, for
+    all grid points at once.
+    """
+    grid = np.asarray(boundaries, dtype=np.float64)
+    timestamps = np.frombuffer(series.timestamps, dtype=np.int64).astype(np.float64)
+    values = np.frombuffer(series.values, dtype=np.int64).astype(np.float64)
+
+    if timestamps.size < 2:
+        zeros = np.zeros(max(grid.size - 1, 0))
+        return grid[:-1].astype(np.int64), zeros, zeros.copy()
+
+    durations = np.diff(timestamps)
+    if linear:
+        segments = (values[:-1] + values[1:]) / 2 * durations
+    else:
+        segments = values[:-1] * durations
+    knots = np.concatenate(([0.0], np.cumsum(segments)))
+
+    segment = np.searchsorted(timestamps, grid, side="right") - 1
+    inside = (segment >= 0) & (segment < timestamps.size - 1)
+    position = np.clip(segment, 0, timestamps.size - 2)
+    elapsed = grid - timestamps[position]
+    start = values[position]
+    if linear:
+        power = start + (values[position + 1] - start) / durations[position] * elapsed
+        partial = (start + power) / 2 * elapsed
+    else:
+        power = start
+        partial = start * elapsed
+
+    integral = np.where(
+        inside,
+        knots[position] + partial,
+        np.where(segment < 0, 0.0, knots[-1]),
+    )
+    power = np.where(inside, power, 0.0)
+    return grid[:-1].astype(np.int64), power[:-1], np.diff(integral) / 3600
+
+
+def series_columns(series: _Series) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Return the timestamps and values of a series as int64 arrays.
+
+    The arrays are read-only views on the typed arrays of the series, no
+    data is copied.
+    """
+    columns = (
+        np.frombuffer(series.timestamps, dtype=np.int64),
+        np.frombuffer(series.values, dtype=np.int64),
+    )
+    for column in columns:
+        column.flags.writeable = False
+    return columns
+
+
+def stack_series(
+    series: Sequence[_Series],
+) -> tuple[NDArray[np.int64], NDArray[np.float64]]:
+    """Return the values of many series aligned on their combined timestamps.
+
+    Returns the sorted union of all timestamps and a 2-D array with a row
+    per series, holding NaN where a series has no value.
+    """
+    columns = [series_columns(item) for item in series]
+    if not columns:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+    timestamps = np.unique(np.concatenate([column for column, _ in columns]))
+    values = np.full((len(columns), timestamps.size), np.nan)
+    for row, (column, column_values) in zip(values, columns, strict=True):
+        row[np.searchsorted(timestamps, column)] = column_values
+    return timestamps, values
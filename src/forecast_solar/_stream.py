@@ -0,0 +1,199 @@
+"""Incremental decoding of JSON responses, as their body arrives."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any
+
+from .models import _SeriesBuilder
+
+# Series of an estimate result that are built into columns while parsing
+_SERIES = frozenset({"watts", "watt_hours_period", "watt_hours", "watt_hours_day"})
+
+_TOKEN = re.compile(
+    r"""
+    [ \t\n\r]*
+    (?:
+        (?P<punct>[{}\[\]:,])
+        | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+        | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+        | (?P<literal>true|false|null)
+    )
+    """,
+    re.VERBOSE,
+)
+# A complete "timestamp": value entry of a series, followed by a comma
+_ENTRY = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*(-?[0-9]+)[ \t\n\r]*,')
+# Characters that may continue a number, or the end of the buffer
+_NUMBER_CHARACTERS = frozenset(("", *"0123456789+-.eE"))
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# Parser states, named after what is expected next
+_VALUE = "value"
+_VALUE_OR_END = "value or end of array"
+_KEY_OR_END = "key or end of object"
+_KEY = "key"
+_COLON = "colon"
+_NEXT = "comma or end of container"
+_DONE = "end of data"
+
+
+class _Frame:
+    """An object or array that is being parsed."""
+
+    __slots__ = ("container", "key")
+
+    def __init__(self, container: dict[str, Any] | list[Any] | _SeriesBuilder) -> None:
+        """Init a frame for a new container."""
+        self.container = container
+        self.key = ""
+
+
+class StreamDecoder:
+    """Decode a JSON document from chunks of bytes, as they arrive.
+
+    The result equals that of json.loads, except for the series of an
+    estimate result, which are decoded entry by entry into columnar series.
+    Only the incomplete token at the end of the last chunk is buffered, so
+    neither the raw body nor a dict per series is ever held in memory.
+    """
+
+    def __init__(self) -> None:
+        """Init a decoder for a new document."""
+        self.bytes_received = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._stack: list[_Frame] = []
+        self._state = _VALUE
+        self._result: Any = None
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the document.
+
+        Raises
+        ------
+            json.JSONDecodeError: If the document is not valid JSON.
+
+        """
+        self.bytes_received += len(chunk)
+        self._buffer += self._decoder.decode(chunk)
+        self._parse(final=False)
+
+    def close(self) -> Any:
+        """Finish parsing the document.
+
+        Returns
+        -------
+            The decoded document.
+
+        Raises
+        ------
+            json.JSONDecodeError: If the document is incomplete.
+
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state is not _DONE:
+            self._error(f"Expecting {self._state}", len(self._buffer))
+        return self._result
+
+    def _parse(self, *, final: bool) -> None:
+        """Parse all complete tokens in the buffer."""
+        buffer = self._buffer
+        position = 0
+        stack = self._stack
+        while True:
+            if self._state is _KEY_OR_END or self._state is _KEY:
+                builder = stack[-1].container
+                if isinstance(builder, _SeriesBuilder):
+                    while match := _ENTRY.match(buffer, position):
+                        builder.add(match[1], int(match[2]))
+                        position = match.end()
+                        self._state = _KEY
+
+            match = _TOKEN.match(buffer, position)
+            if match is None or (
+                not final
+                and match.lastgroup == "number"
+                and buffer[match.end() : match.end() + 1] in _NUMBER_CHARACTERS
+            ):
+                # Wait for the rest of a token that may be incomplete
+                if final and buffer[position:].strip(" \t\n\r"):
+                    self._error("Invalid token", position)
+                break
+            position = match.end()
+            self._token(match.lastgroup, match[0].lstrip(" \t\n\r"), position)
+
+        self._buffer = buffer[position:]
+
+    def _token(self, kind: str | None, text: str, position: int) -> None:
+        """Handle a single token."""
+        state = self._state
+        if kind == "punct":
+            self._punctuation(text, position)
+        elif kind == "string" and state in (_KEY_OR_END, _KEY):
+            self._stack[-1].key = json.loads(text) if "\\" in text else text[1:-1]
+            self._state = _COLON
+        elif state is _VALUE or state is _VALUE_OR_END:
+            if kind == "string":
+                self._value(json.loads(text) if "\\" in text else text[1:-1])
+            elif kind == "number":
+                self._value(float(text) if text.strip("-0123456789") else int(text))
+            else:
+                self._value(_LITERALS[text])
+        else:
+            self._error(f"Expecting {state}", position)
+
+    def _punctuation(self, text: str, position: int) -> None:
+        """Handle a structural character."""
+        state = self._state
+        stack = self._stack
+        top = stack[-1].container if stack else None
+        if text == "{" and state in (_VALUE, _VALUE_OR_END):
+            in_result = len(stack) == 2 and stack[0].key == "result"
+            if in_result and stack[1].key in _SERIES:
+                stack.append(_Frame(_SeriesBuilder()))
+            else:
+                stack.append(_Frame({}))
+            self._state = _KEY_OR_END
+        elif text == "[" and state in (_VALUE, _VALUE_OR_END):
+            stack.append(_Frame([]))
+            self._state = _VALUE_OR_END
+        elif (
+            text == "}" and state in (_KEY_OR_END, _NEXT) and not isinstance(top, list)
+        ):
+            container = stack.pop().container
+            if isinstance(container, _SeriesBuilder):
+                self._value(container.build())
+            else:
+                self._value(container)
+        elif text == "]" and state in (_VALUE_OR_END, _NEXT) and isinstance(top, list):
+            self._value(stack.pop().container)
+        elif text == ":" and state is _COLON:
+            self._state = _VALUE
+        elif text == "," and state is _NEXT:
+            self._state = _VALUE if isinstance(top, list) else _KEY
+        else:
+            self._error(f"Expecting {state}", position)
+
+    def _value(self, value: Any) -> None:
+        """Store a complete value in its container."""
+        if not self._stack:
+            self._result = value
+            self._state = _DONE
+            return
+        frame = self._stack[-1]
+        container = frame.container
+        if isinstance(container, list):
+            container.append(value)
+        elif isinstance(container, dict):
+            container[frame.key] = value
+        else:
+            container.add(frame.key, value)
+        self._state = _NEXT
+
+    def _error(self, message: str, position: int) -> None:
+        """Raise a decode error at a position in the buffer."""
+        raise json.JSONDecodeError(message, self._buffer, position)
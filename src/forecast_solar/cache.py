@@ -0,0 +1,307 @@
+"""Caches for Forecast.Solar estimates."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from .models import Estimate
+
+if TYPE_CHECKING:
+    from collections.abc import MutableSet
+    from os import PathLike
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Cached estimate with the moment it was fetched.
+
+    Attributes
+    ----------
+        estimate: The cached estimate.
+        fetched_at: Moment the estimate was fetched from the API.
+
+    """
+
+    estimate: Estimate
+    fetched_at: datetime
+
+
+@dataclass
+class EstimateCache:
+    """Least recently used cache of estimates with a time to live.
+
+    Estimates are keyed on the estimate URL and its query parameters, so a
+    single cache can be shared by clients for different sites.
+
+    Attributes
+    ----------
+        ttl: How long a cached estimate is served without refetching.
+        max_size: Maximum number of cached estimates.
+        hits: Number of lookups that were served from the cache.
+        misses: Number of lookups that were not in the cache, or expired.
+        serve_stale: Serve an expired estimate while it is refreshed in
+            the background, instead of waiting for the refresh.
+        stale_hits: Number of expired estimates that were served, because
+            the rate limit was reached or serve_stale is set.
+
+    """
+
+    ttl: timedelta = timedelta(minutes=15)
+    max_size: int = 256
+    serve_stale: bool = False
+
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    _entries: OrderedDict[CacheKey, CacheEntry] = field(
+        default_factory=OrderedDict, repr=False
+    )
+
+    def __len__(self) -> int:
+        """Return the number of cached estimates."""
+        return len(self._entries)
+
+    def _entry(self, key: CacheKey) -> CacheEntry | None:
+        """Return the entry for a key, if there is one."""
+        return self._entries.get(key)
+
+    def get(self, key: CacheKey) -> Estimate | None:
+        """Return a cached estimate, if it has not expired.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+
+        Returns:
+        -------
+            The cached estimate, or None.
+
+        """
+        entry = self._entry(key)
+        if entry is None or datetime.now(UTC) - entry.fetched_at >= self.ttl:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.estimate
+
+    def get_stale(self, key: CacheKey) -> Estimate | None:
+        """Return a cached estimate, even when it has expired.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+
+        Returns:
+        -------
+            The cached estimate, or None.
+
+        """
+        entry = self._entry(key)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        self.stale_hits += 1
+        return entry.estimate
+
+    def set(self, key: CacheKey, estimate: Estimate) -> None:
+        """Store an estimate, evicting the least recently used when full.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+            estimate: The estimate to store.
+
+        """
+        self._remember(key, CacheEntry(estimate, datetime.now(UTC)))
+
+    async def load(self, key: CacheKey) -> None:
+        """Make the entry of a key available to get, without blocking.
+
+        Entries in memory need no loading, so this does nothing here.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+
+        """
+
+    async def store(self, key: CacheKey, estimate: Estimate) -> None:
+        """Store an estimate, without blocking.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+            estimate: The estimate to store.
+
+        """
+        self.set(key, estimate)
+
+    def _remember(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Keep an entry in memory, evicting the least recently used."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached estimates."""
+        self._entries.clear()
+
+
+@dataclass
+class PersistentEstimateCache(EstimateCache):
+    """Estimate cache that is kept in a SQLite database, across restarts.
+
+    Every stored estimate is written to the database right away. Estimates
+    are only read from the database the first time their key is looked up,
+    and are then kept in memory like in EstimateCache. The timestamps of a
+    loaded estimate are parsed when it is first used. The client reads and
+    writes the database in a worker thread, so the event loop is not
+    blocked on disk. The database keeps the max_size most recently fetched
+    estimates.
+
+    Keys are stored as a SHA-256 hash, so API keys in the estimate URL are
+    not written to disk.
+
+    Attributes
+    ----------
+        path: Path of the SQLite database, created when missing.
+
+    """
+
+    path: str | PathLike[str] = field(kw_only=True)
+    _connection: sqlite3.Connection | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _absent: MutableSet[CacheKey] = field(default_factory=set, repr=False)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return the database connection, opening it on first use."""
+        if self._connection is None:
+            # Used from worker threads, one at a time under the lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS estimates "
+                "(key TEXT PRIMARY KEY, fetched_at TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+        return self._connection
+
+    def _entry(self, key: CacheKey) -> CacheEntry | None:
+        """Return the entry for a key, loading it from the database."""
+        if key in self._absent:
+            return None
+        if (entry := self._entries.get(key)) is None and (
+            entry := self._read(key)
+        ) is not None:
+            self._remember(key, entry)
+        return entry
+
+    async def load(self, key: CacheKey) -> None:
+        """Read the entry of a key from the database in a worker thread.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+
+        """
+        if key in self._entries:
+            return
+        entry = await asyncio.to_thread(self._read, key)
+        if key in self._entries:
+            return
+        if entry is None:
+            # Not in the database either, so get does not read it again
+            self._absent.add(key)
+        else:
+            self._remember(key, entry)
+
+    def set(self, key: CacheKey, estimate: Estimate) -> None:
+        """Store an estimate, in memory and in the database.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+            estimate: The estimate to store.
+
+        """
+        entry = CacheEntry(estimate, datetime.now(UTC))
+        self._remember(key, entry)
+        self._write(key, entry)
+
+    async def store(self, key: CacheKey, estimate: Estimate) -> None:
+        """Store an estimate, writing it to the database in a worker thread.
+
+        Args:
+        ----
+            key: The cache key of the estimate.
+            estimate: The estimate to store.
+
+        """
+        entry = CacheEntry(estimate, datetime.now(UTC))
+        self._remember(key, entry)
+        await asyncio.to_thread(self._write, key, entry)
+
+    def _read(self, key: CacheKey) -> CacheEntry | None:
+        """Read the entry of a key from the database."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT fetched_at, data FROM estimates WHERE key = ?",
+                (_digest(key),),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(
+            Estimate.from_dict(json.loads(row[1]), lazy=True),
+            datetime.fromisoformat(row[0]),
+        )
+
+    def _remember(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Keep an entry in memory, evicting the least recently used."""
+        self._absent.discard(key)
+        super()._remember(key, entry)
+
+    def _write(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Write an entry to the database, pruning the oldest beyond max_size."""
+        data = json.dumps(entry.estimate.to_dict())
+        with self._lock, self.connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO estimates VALUES (?, ?, ?)",
+                (_digest(key), entry.fetched_at.isoformat(), data),
+            )
+            connection.execute(
+                "DELETE FROM estimates WHERE key NOT IN "
+                "(SELECT key FROM estimates ORDER BY fetched_at DESC LIMIT ?)",
+                (self.max_size,),
+            )
+
+    def clear(self) -> None:
+        """Remove all cached estimates, in memory and in the database."""
+        super().clear()
+        self._absent.clear()
+        with self._lock, self.connection as connection:
+            connection.execute("DELETE FROM estimates")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _digest(key: CacheKey) -> str:
+    """Return the hash a key is stored under in the database."""
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
@@ -0,0 +1,119 @@
+"""Refresh estimates only while the sun is up."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from .solar import sun_times
+
+if TYPE_CHECKING:
+    from .forecast_solar import ForecastSolar
+    from .models import Estimate
+
+_DAY = timedelta(days=1)
+
+
+@dataclass
+class DaylightRefresher:
+    """Skip estimate refreshes at night, when the forecast barely changes.
+
+    Refreshes are allowed from pre_dawn before sunrise until after_sunset
+    after sunset. Sunrise and sunset are computed locally from the location
+    of the client, and kept on the refresher for the current and next day,
+    so a fleet with a refresher per site computes them once per site a day.
+
+    Attributes
+    ----------
+        client: The client to request estimates with.
+        pre_dawn: Time before sunrise from which estimates are refreshed.
+        after_sunset: Time after sunset until which estimates are refreshed.
+        last_estimate: The last requested estimate, served at night.
+        skipped: Number of refreshes that were skipped at night.
+
+    """
+
+    client: ForecastSolar
+    pre_dawn: timedelta = timedelta(hours=1)
+    after_sunset: timedelta = timedelta(0)
+    last_estimate: Estimate | None = None
+    skipped: int = 0
+    _sun_times: dict[date, tuple[datetime, datetime]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def _solar_day(self, at: datetime) -> date:
+        """Return the day in local solar time of a moment."""
+        return (at.astimezone(UTC) + timedelta(hours=self.client.longitude / 15)).date()
+
+    def _window(self, day: date) -> tuple[datetime, datetime]:
+        """Return the start and end of the refreshes on a day."""
+        if (times := self._sun_times.get(day)) is None:
+            # Days before yesterday are not looked up again
+            for known in [known for known in self._sun_times if known < day - _DAY]:
+                del self._sun_times[known]
+            times = self._sun_times[day] = sun_times(
+                self.client.latitude, self.client.longitude, day
+            )
+        sunrise, sunset = times
+        return sunrise - self.pre_dawn, sunset + self.after_sunset
+
+    def is_night(self, at: datetime | None = None) -> bool:
+        """Return if refreshes are skipped at a moment.
+
+        Args:
+        ----
+            at: The moment, timezone aware, now when None.
+
+        Returns:
+        -------
+            True between after_sunset after sunset and pre_dawn before the
+            next sunrise.
+
+        """
+        at = at or datetime.now(UTC)
+        start, end = self._window(self._solar_day(at))
+        return not start <= at <= end
+
+    def next_refresh(self, at: datetime | None = None) -> datetime:
+        """Return the first moment an estimate may be refreshed.
+
+        Args:
+        ----
+            at: The moment, timezone aware, now when None.
+
+        Returns:
+        -------
+            The moment itself during the day, otherwise the start of the
+            next pre-dawn window.
+
+        """
+        at = at or datetime.now(UTC)
+        day = self._solar_day(at)
+        start, end = self._window(day)
+        if at < start:
+            return start
+        if at <= end:
+            return at
+        return self._window(day + _DAY)[0]
+
+    async def estimate(self, actual: float = 0, *, lazy: bool = False) -> Estimate:
+        """Get an estimate, without a request at night.
+
+        Args:
+        ----
+            actual: The production for the day in kWh so far.
+            lazy: Only parse the timestamps of a series when it is first used.
+
+        Returns:
+        -------
+            The last estimate at night, when there is one. Otherwise the
+            estimate of the client.
+
+        """
+        if self.last_estimate is not None and self.is_night():
+            self.skipped += 1
+            return self.last_estimate
+        self.last_estimate = await self.client.estimate(actual, lazy=lazy)
+        return self.last_estimate
@@ -12,6 +12,10 @@ class ForecastSolarConnectionError(ForecastSolarError):
     """Forecast.Solar API connection exception."""
 
 
+class ForecastSolarCircuitOpenError(ForecastSolarConnectionError):
+    """Forecast.Solar API unavailable, requests are not sent exception."""
+
+
 class ForecastSolarConfigError(ForecastSolarError):
     """Forecast.Solar API configuration exception."""
 
@@ -0,0 +1,248 @@
+"""Bulk estimates for many Forecast.Solar sites."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Self
+
+from .exceptions import ForecastSolarRatelimitError
+from .forecast_solar import API_URL, ForecastSolar
+from .transport import Transport
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from datetime import datetime
+
+    from aiohttp import ClientSession
+    from yarl import URL
+
+    from .cache import CacheKey, EstimateCache
+    from .models import Estimate, Plane, Ratelimit
+    from .observer import RequestObserver
+    from .retry import CircuitBreaker, RetryPolicy
+    from .scheduler import RatelimitScheduler
+
+
+@dataclass
+class Site:
+    """Represents the configuration of a single installation.
+
+    Attributes
+    ----------
+        latitude: Latitude of the installation.
+        longitude: Longitude of the installation.
+        declination: The tilt of the solar panels (0-90 degrees).
+        azimuth: The direction the solar panels are facing (-180 to 180 degrees).
+        kwp: The size of the solar panels in kWp.
+        damping: The damping of the solar panels.
+        damping_morning: The damping of the solar panels in the morning.
+        damping_evening: The damping of the solar panels in the evening.
+        horizon: Comma separated horizon degrees.
+        planes: Additional planes, only used when an API key is provided.
+        inverter: The maximum power of the inverter in kilo watts.
+        actual: The production for the day in kWh so far.
+
+    """
+
+    latitude: float
+    longitude: float
+    declination: float
+    azimuth: float
+    kwp: float
+
+    damping: float = 0
+    damping_morning: float | None = None
+    damping_evening: float | None = None
+    horizon: str | None = None
+    planes: list[Plane] | None = None
+    inverter: float | None = None
+    actual: float = 0
+
+
+@dataclass(frozen=True, slots=True)
+class FleetResult:
+    """Outcome of the estimate of a single site.
+
+    Attributes
+    ----------
+        site: The site the estimate was requested for.
+        estimate: The estimate, or None when the request failed.
+        error: The error raised for the site, or None on success.
+
+    """
+
+    site: Site
+    estimate: Estimate | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class ForecastSolarFleet:
+    """Request estimates for many sites over one shared session.
+
+    At most max_concurrency requests are in flight at once. When the session
+    is created by the fleet without a transport, its connection pool is
+    sized to match.
+    """
+
+    sites: Sequence[Site]
+
+    api_key: str | None = None
+    max_concurrency: int = 10
+    session: ClientSession | None = None
+    ratelimit: Ratelimit | None = None
+    json_loads: Callable[[bytes], Any] = json.loads
+    stream: bool = False
+    share_location_decimals: int | None = None
+    clear_sky_fallback: bool = False
+    cache: EstimateCache | None = None
+    scheduler: RatelimitScheduler | None = None
+    retry: RetryPolicy | None = None
+    circuit_breaker: CircuitBreaker | None = None
+    transport: Transport | None = None
+    observer: RequestObserver | None = None
+    base_url: URL = API_URL
+    _close_session: bool = field(default=False, repr=False)
+    _refreshing: dict[CacheKey, asyncio.Task[Estimate]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        """Validate the fleet configuration.
+
+        Raises
+        ------
+            ValueError: If max_concurrency is not positive.
+
+        """
+        if self.max_concurrency < 1:
+            msg = "max_concurrency must be at least 1"
+            raise ValueError(msg)
+
+    @property
+    def _transport(self) -> Transport:
+        """Return the transport of the fleet, sized to max_concurrency."""
+        return self.transport or Transport(limit=self.max_concurrency)
+
+    def _client(
+        self,
+        site: Site,
+        session: ClientSession,
+        ratelimit_reset: datetime | None = None,
+    ) -> ForecastSolar:
+        """Build the client for a single site."""
+        return ForecastSolar(
+            latitude=site.latitude,
+            longitude=site.longitude,
+            declination=site.declination,
+            azimuth=site.azimuth,
+            kwp=site.kwp,
+            api_key=self.api_key,
+            damping=site.damping,
+            damping_morning=site.damping_morning,
+            damping_evening=site.damping_evening,
+            horizon=site.horizon,
+            planes=site.planes,
+            inverter=site.inverter,
+            session=session,
+            json_loads=self.json_loads,
+            stream=self.stream,
+            share_location_decimals=self.share_location_decimals,
+            clear_sky_fallback=self.clear_sky_fallback,
+            cache=self.cache,
+            scheduler=self.scheduler,
+            retry=self.retry,
+            circuit_breaker=self.circuit_breaker,
+            transport=self._transport,
+            observer=self.observer,
+            base_url=self.base_url,
+            _ratelimit_reset=ratelimit_reset,
+            _refreshing=self._refreshing,
+        )
+
+    async def estimate(self, *, lazy: bool = False) -> list[FleetResult]:
+        """Get solar production estimations for all sites.
+
+        A failing site does not abort the batch, its error is returned in
+        its result. Once the rate limit is reached, the remaining sites fail
+        with the same error without sending a request. With a cache, clear
+        sky fallback or scheduler, the remaining sites are still served by
+        them, only requests to the API are not sent.
+
+        Args:
+        ----
+            lazy: Only parse the timestamps of a series when it is first used.
+
+        Returns:
+        -------
+            A FleetResult per site, in the order of the sites.
+
+        """
+        if self.session is None:
+            self.session = self._transport.create_session()
+            self._close_session = True
+
+        session = self.session
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        ratelimit_error: ForecastSolarRatelimitError | None = None
+        # Without a cache, fallback or scheduler every estimate is a request
+        shortcut = (
+            self.cache is None
+            and not self.clear_sky_fallback
+            and self.scheduler is None
+        )
+
+        async def run(site: Site) -> FleetResult:
+            nonlocal ratelimit_error
+            async with semaphore:
+                reset_at = None
+                if ratelimit_error is not None:
+                    if shortcut:
+                        return FleetResult(site, error=ratelimit_error)
+                    reset_at = ratelimit_error.reset_at
+                client = self._client(site, session, reset_at)
+                try:
+                    estimate = await client.estimate(site.actual, lazy=lazy)
+                except ForecastSolarRatelimitError as err:
+                    ratelimit_error = err
+                    return FleetResult(site, error=err)
+                except Exception as err:  # noqa: BLE001
+                    # Also malformed responses, which must not abort the batch
+                    return FleetResult(site, error=err)
+                if client.ratelimit is not None:
+                    self.ratelimit = client.ratelimit
+                return FleetResult(site, estimate=estimate)
+
+        return await asyncio.gather(*(run(site) for site in self.sites))
+
+    async def close(self) -> None:
+        """Close open client session, and stop background refreshes."""
+        # Refreshes of stale estimates outlive the clients of the sites
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.session and self._close_session:
+            await self.session.close()
+
+    async def __aenter__(self) -> Self:
+        """Async enter.
+
+        Returns
+        -------
+            The ForecastSolarFleet object.
+
+        """
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        await self.close()
@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Self
-
-from aiohttp import ClientSession
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, Self
+from weakref import WeakKeyDictionary
+
+from aiohttp import ClientError, ClientSession
 from yarl import URL
 
+from ._stream import StreamDecoder
 from .exceptions import (
     ForecastSolarAuthenticationError,
     ForecastSolarConfigError,
@@ -17,6 +24,57 @@ from .exceptions import (
     ForecastSolarRequestError,
 )
 from .models import Estimate, Plane, Ratelimit
+from .observer import RequestMetrics
+from .solar import ClearSkyEstimator
+from .transport import Transport
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from aiohttp import ClientResponse
+
+    from .cache import CacheKey, EstimateCache
+    from .observer import RequestObserver
+    from .retry import CircuitBreaker, RetryPolicy
+    from .scheduler import RatelimitScheduler
+
+_ERROR_STATUSES: dict[int, Callable[[dict[str, Any]], ForecastSolarError]] = {
+    400: ForecastSolarRequestError,
+    401: ForecastSolarAuthenticationError,
+    403: ForecastSolarAuthenticationError,
+    404: ForecastSolarRequestError,
+    422: ForecastSolarConfigError,
+    429: ForecastSolarRatelimitError,
+}
+
+API_URL = URL("https://api.forecast.solar")
+
+# Largest chunk of a response body that is decoded at once, in bytes
+_STREAM_CHUNK_SIZE = 65536
+
+_RequestKey = tuple[str, tuple[tuple[str, Any], ...], bool]
+
+# Requests in flight per session, shared by all clients using that session
+_IN_FLIGHT: WeakKeyDictionary[
+    ClientSession,
+    dict[
+        _RequestKey,
+        asyncio.Task[tuple[Any, Ratelimit | None, RequestMetrics | None]],
+    ],
+] = WeakKeyDictionary()
+
+
+def _task_done(
+    tasks: dict[Any, asyncio.Task[Any]], key: object, task: asyncio.Task[Any]
+) -> None:
+    """Forget a finished task, and retrieve its exception.
+
+    The exception is raised to every waiting caller, retrieving it here
+    avoids a warning when there are none left.
+    """
+    tasks.pop(key, None)
+    if not task.cancelled():
+        task.exception()
 
 
 @dataclass
@@ -39,8 +97,22 @@ class ForecastSolar:
     session: ClientSession | None = None
     ratelimit: Ratelimit | None = None
     inverter: float | None = None
+    json_loads: Callable[[bytes], Any] = json.loads
+    stream: bool = False
+    share_location_decimals: int | None = None
+    clear_sky_fallback: bool = False
+    cache: EstimateCache | None = None
+    scheduler: RatelimitScheduler | None = None
+    retry: RetryPolicy | None = None
+    circuit_breaker: CircuitBreaker | None = None
+    transport: Transport = field(default_factory=Transport)
+    observer: RequestObserver | None = None
+    base_url: URL = API_URL
     _close_session: bool = False
-    _base_url = URL("https://api.forecast.solar")
+    _ratelimit_reset: datetime | None = None
+    _refreshing: dict[CacheKey, asyncio.Task[Estimate]] = field(
+        default_factory=dict, repr=False
+    )
 
     def _build_plane_path(self) -> str:
         """Build the plane path segment for API URLs.
@@ -58,6 +130,66 @@ class ForecastSolar:
                 path += f"/{plane.declination}/{plane.azimuth}/{plane.kwp}"
         return path
 
+    def _build_url(self, uri: str, *, authenticate: bool = True) -> URL:
+        """Build the full URL for a request URI.
+
+        Args:
+        ----
+            uri: Request URI, for example, 'estimate'
+            authenticate: Prefix request with api_key.
+
+        Returns:
+        -------
+            The URL of the request.
+
+        """
+        # Add API key if one is provided
+        if authenticate and self.api_key is not None:
+            url = self.base_url.with_path(f"{self.api_key}/")
+        else:
+            url = self.base_url
+
+        return url.join(URL(uri))
+
+    def _shared_site_path(self, decimals: int) -> str:
+        """Build the site path segment of a 1 kWp estimate shared by sites.
+
+        Sites at the same rounded location, with the same orientation, only
+        differ in size and share this path.
+        """
+        return (
+            f"{round(self.latitude, decimals)}/{round(self.longitude, decimals)}"
+            f"/{self.declination}/{self.azimuth}/1"
+        )
+
+    def _shares_estimate(self, actual: float) -> bool:
+        """Return if the estimate can be scaled from a shared 1 kWp estimate.
+
+        The production so far, the inverter limit and additional planes make
+        an estimate specific to a single site.
+        """
+        return (
+            not actual
+            and self.inverter is None
+            and not (self.planes and self.api_key is not None)
+        )
+
+    def _url_template(self, uri: str) -> str:
+        """Return a request URI without the parameters of the site."""
+        paths = [f"{self.latitude}/{self.longitude}/{self._build_plane_path()}"]
+        if self.share_location_decimals is not None:
+            paths.append(self._shared_site_path(self.share_location_decimals))
+        for path in paths:
+            uri = uri.replace(path, "{latitude}/{longitude}/{planes}")
+        return uri
+
+    def _quota_exhausted(self) -> bool:
+        """Return if the rate limit is known to be reached right now."""
+        return (
+            self._ratelimit_reset is not None
+            and self._ratelimit_reset > datetime.now(UTC)
+        )
+
     async def _request(
         self,
         uri: str,
@@ -65,11 +197,15 @@ class ForecastSolar:
         rate_limit: bool = True,
         authenticate: bool = True,
         params: dict[str, Any] | None = None,
+        build: Callable[[Any], Any] | None = None,
     ) -> Any:
         """Handle a request to the Forecast.Solar API.
 
         A generic method for sending/handling HTTP requests done against
-        the Forecast.Solar API.
+        the Forecast.Solar API. Identical requests that are in flight on the
+        same session are only sent once, every caller receives the same
+        response or exception. The observer, if any, is notified by the
+        caller that sent the request.
 
         Args:
         ----
@@ -78,11 +214,12 @@ class ForecastSolar:
                 endpoints that are missing rate limiting headers in response.
             authenticate: Prefix request with api_key. Set to False for
                 endpoints that do not provide authentication.
+            build: Function to build a model from the decoded response.
 
         Returns:
         -------
             A Python dictionary (JSON decoded) with the response from
-            the Forecast.Solar API.
+            the Forecast.Solar API, or the model built from it.
 
         Raises:
         ------
@@ -97,62 +234,263 @@ class ForecastSolar:
                 the rate limit of the Forecast.Solar API.
 
         """
-        # Add API key if one is provided
-        if authenticate and self.api_key is not None:
-            url = self._base_url.with_path(f"{self.api_key}/")
-        else:
-            url = self._base_url
-
-        url = url.join(URL(uri))
+        url = self._build_url(uri, authenticate=authenticate)
 
         if self.session is None:
-            self.session = ClientSession()
+            self.session = self.transport.create_session()
             self._close_session = True
 
-        response = await self.session.request(
-            "GET",
-            url,
-            params=params,
-            ssl=False,
-        )
+        # Identical requests in flight on the same session share one response
+        key: _RequestKey = (str(url), tuple(sorted((params or {}).items())), rate_limit)
+        in_flight = _IN_FLIGHT.setdefault(self.session, {})
+        if sender := (task := in_flight.get(key)) is None:
+            task = asyncio.create_task(
+                self._fetch(
+                    self.session,
+                    url,
+                    rate_limit=rate_limit,
+                    params=params,
+                    uri=uri,
+                )
+            )
+            in_flight[key] = task
+            task.add_done_callback(lambda done: _task_done(in_flight, key, done))
+
+        data, ratelimit, metrics = await asyncio.shield(task)
+
+        if ratelimit is not None:
+            self.ratelimit = ratelimit
+            if ratelimit.remaining_calls == 0:
+                self._ratelimit_reset = ratelimit.retry_at or (
+                    datetime.now(UTC) + timedelta(seconds=ratelimit.period)
+                )
+
+        if not sender or metrics is None or self.observer is None:
+            return data if build is None else build(data)
+
+        # Only the caller that sent the request reports it
+        started = time.perf_counter()
+        try:
+            if build is not None:
+                data = build(data)
+        except Exception as err:
+            metrics.build_time = time.perf_counter() - started
+            self._observe(metrics, err)
+            raise
+        metrics.build_time = time.perf_counter() - started
+        self._observe(metrics)
+        return data
+
+    def _observe(
+        self, metrics: RequestMetrics | None, error: BaseException | None = None
+    ) -> None:
+        """Report the measurements of a request to the observer, if any."""
+        if metrics is not None and self.observer is not None:
+            metrics.error = error
+            self.observer.on_request(metrics)
+
+    async def _fetch(
+        self,
+        session: ClientSession,
+        url: URL,
+        *,
+        rate_limit: bool,
+        params: dict[str, Any] | None,
+        uri: str,
+    ) -> tuple[Any, Ratelimit | None, RequestMetrics | None]:
+        """Send a request, with the scheduler, retries and circuit breaker.
 
-        if response.status in (502, 503):
-            raise ForecastSolarConnectionError("The Forecast.Solar API is unreachable")
+        When the rate limit is reached, a request with a scheduler is held
+        until the rate limit resets and then sent again. Otherwise, failed
+        requests are retried according to the retry policy. Every failed
+        attempt is reported to the observer right away.
+
+        Returns
+        -------
+            The decoded response, the rate limit if it was parsed, and the
+            measurements of the request when there is an observer.
+
+        """
+        scheduler = self.scheduler if rate_limit else None
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if scheduler is not None:
+                await scheduler.acquire(self.api_key)
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.check()
+
+            metrics = None
+            if self.observer is not None:
+                metrics = RequestMetrics(self._url_template(uri))
+            try:
+                data, ratelimit = await self._send(
+                    session, url, rate_limit=rate_limit, params=params, metrics=metrics
+                )
+            except (ForecastSolarError, ClientError, TimeoutError) as err:
+                self._observe(metrics, err)
+                if scheduler is not None and isinstance(
+                    err, ForecastSolarRatelimitError
+                ):
+                    scheduler.block(self.api_key, err.reset_at)
+                    continue
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(err)
+                if (
+                    self.retry is None
+                    or (
+                        delay := self.retry.delay(
+                            attempt, err, time.monotonic() - started_at
+                        )
+                    )
+                    is None
+                ):
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException as err:
+                # Also ends a trial request on a response that cannot be used
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(err)
+                raise
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record()
+            if scheduler is not None and ratelimit is not None:
+                scheduler.update(self.api_key, ratelimit)
+            return data, ratelimit, metrics
+
+    async def _send(
+        self,
+        session: ClientSession,
+        url: URL,
+        *,
+        rate_limit: bool,
+        params: dict[str, Any] | None,
+        metrics: RequestMetrics | None,
+    ) -> tuple[Any, Ratelimit | None]:
+        """Send a request and decode the response.
+
+        Returns
+        -------
+            The decoded response, and the rate limit if it was parsed.
 
-        if response.status == 400:
-            data = await response.json()
-            raise ForecastSolarRequestError(data["message"])
+        """
+        started = time.perf_counter()
+        try:
+            async with session.request(
+                "GET",
+                url,
+                params=params,
+                ssl=self.transport.verify_ssl,
+                timeout=self.transport.timeout,
+            ) as response:
+                if metrics is not None:
+                    metrics.status = response.status
+                    metrics.headers_time = time.perf_counter() - started
+                return await self._decode(
+                    response, rate_limit=rate_limit, metrics=metrics
+                )
+        except TimeoutError as exception:
+            msg = "Timeout occurred while connecting to the Forecast.Solar API"
+            raise ForecastSolarConnectionError(msg) from exception
+
+    async def _decode(
+        self,
+        response: ClientResponse,
+        *,
+        rate_limit: bool,
+        metrics: RequestMetrics | None,
+    ) -> tuple[Any, Ratelimit | None]:
+        """Decode a response, raising the matching error for its status.
 
-        if response.status in (401, 403):
-            data = await response.json()
-            raise ForecastSolarAuthenticationError(data["message"])
+        Returns
+        -------
+            The decoded response, and the rate limit if it was parsed.
 
-        if response.status == 422:
-            data = await response.json()
-            raise ForecastSolarConfigError(data["message"])
+        """
+        if response.status in (502, 503):
+            raise ForecastSolarConnectionError("The Forecast.Solar API is unreachable")
 
-        if response.status == 429:
-            data = await response.json()
-            raise ForecastSolarRatelimitError(data["message"])
+        content_type = response.headers.get("Content-Type", "")
+        if (
+            self.stream
+            and response.status == 200
+            and "application/json" in content_type
+        ):
+            return await self._decode_stream(
+                response, rate_limit=rate_limit, metrics=metrics
+            )
 
-        if response.status == 404:
-            data = await response.json()
-            raise ForecastSolarRequestError(data["message"])
+        started = time.perf_counter()
+        body = await response.read()
+        if metrics is not None:
+            metrics.read_time = time.perf_counter() - started
+            metrics.bytes_received = len(body)
 
+        if response.status in _ERROR_STATUSES:
+            data = self.json_loads(body)
+            raise _ERROR_STATUSES[response.status](data["message"])
+
+        ratelimit = None
         if rate_limit and response.status == 200:
-            self.ratelimit = Ratelimit.from_response(response)
+            ratelimit = Ratelimit.from_response(response)
 
         response.raise_for_status()
 
-        content_type = response.headers.get("Content-Type", "")
         if "application/json" not in content_type:
-            text = await response.text()
+            text = body.decode(response.get_encoding(), errors="replace")
             raise ForecastSolarError(
                 "Unexpected response from the Forecast.Solar API",
                 {"Content-Type": content_type, "response": text},
             )
 
-        return await response.json()
+        if metrics is None:
+            return self.json_loads(body), ratelimit
+
+        started = time.perf_counter()
+        data = self.json_loads(body)
+        metrics.decode_time = time.perf_counter() - started
+        if ratelimit is not None:
+            metrics.ratelimit_remaining = ratelimit.remaining_calls
+        return data, ratelimit
+
+    async def _decode_stream(
+        self,
+        response: ClientResponse,
+        *,
+        rate_limit: bool,
+        metrics: RequestMetrics | None,
+    ) -> tuple[Any, Ratelimit | None]:
+        """Decode a successful JSON response while its body arrives.
+
+        The read time of the metrics includes the decoding, which is also
+        measured on its own.
+
+        Returns
+        -------
+            The decoded response, and the rate limit if it was parsed.
+
+        """
+        ratelimit = Ratelimit.from_response(response) if rate_limit else None
+        decoder = StreamDecoder()
+        started = time.perf_counter()
+        decode_time = 0.0
+        async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+            decode_started = time.perf_counter()
+            decoder.feed(chunk)
+            decode_time += time.perf_counter() - decode_started
+        decode_started = time.perf_counter()
+        data = decoder.close()
+        if metrics is not None:
+            finished = time.perf_counter()
+            metrics.read_time = finished - started
+            metrics.decode_time = decode_time + finished - decode_started
+            metrics.bytes_received = decoder.bytes_received
+            if ratelimit is not None:
+                metrics.ratelimit_remaining = ratelimit.remaining_calls
+        return data, ratelimit
 
     async def validate_plane(self) -> bool:
         """Validate plane by calling the Forecast.Solar API.
@@ -182,13 +520,24 @@ class ForecastSolar:
 
         return True
 
-    async def estimate(self, actual: float = 0) -> Estimate:
+    async def estimate(self, actual: float = 0, *, lazy: bool = False) -> Estimate:
         """Get solar production estimations from the Forecast.Solar API.
 
+        With clear_sky_fallback set, an expired cached estimate is returned
+        when the API is unreachable or the rate limit is reached. Only when
+        there is none, a synthetic clear sky estimate is returned.
+
+        With share_location_decimals set, the estimate for 1 kWp at the
+        location rounded to that many decimals is requested and scaled to the
+        kWp of the site, unless the estimate is specific to this site. Sites
+        that only differ in size then share a single request, and a single
+        cached estimate.
+
         Args:
         ----
             actual: The production for the day in kWh so far. Used to improve
                 the estimation for the current day if an API key is provided.
+            lazy: Only parse the timestamps of a series when it is first used.
 
         Returns:
         -------
@@ -206,15 +555,145 @@ class ForecastSolar:
         if self.api_key is not None:
             params["actual"] = str(actual)
 
-        data = await self._request(
-            f"estimate/{self.latitude}/{self.longitude}/{self._build_plane_path()}",
+        try:
+            decimals = self.share_location_decimals
+            if decimals is not None and self._shares_estimate(actual):
+                uri = f"estimate/{self._shared_site_path(decimals)}"
+                estimate = await self._estimate(uri, params, lazy=lazy)
+                return estimate.scaled(self.kwp)
+
+            uri = (
+                f"estimate/{self.latitude}/{self.longitude}/{self._build_plane_path()}"
+            )
+            return await self._estimate(uri, params, lazy=lazy)
+        except (ForecastSolarConnectionError, ForecastSolarRatelimitError):
+            if not self.clear_sky_fallback:
+                raise
+            return self.clear_sky_estimate()
+
+    def clear_sky_estimate(self, start: date | None = None, days: int = 2) -> Estimate:
+        """Compute a clear sky estimate locally, without the API.
+
+        Uses the planes, horizon, damping and inverter of the client. The
+        days are in the solar timezone of the longitude.
+
+        Args:
+        ----
+            start: The first day of the estimate, today when None.
+            days: The number of days.
+
+        Returns:
+        -------
+            A synthetic Estimate object.
+
+        """
+        planes = [Plane(self.declination, self.azimuth, self.kwp)]
+        if self.planes and self.api_key is not None:
+            planes.extend(self.planes)
+        estimate = ClearSkyEstimator(
+            self.latitude, self.longitude, planes, horizon=self.horizon
+        ).estimate(start, days)
+
+        damping_morning = damping_evening = self.damping
+        if self.damping_morning is not None and self.damping_evening is not None:
+            damping_morning, damping_evening = (
+                self.damping_morning,
+                self.damping_evening,
+            )
+        return estimate.transform(
+            damping_morning=damping_morning,
+            damping_evening=damping_evening,
+            inverter=self.inverter,
+        )
+
+    async def _estimate(
+        self, uri: str, params: dict[str, str], *, lazy: bool
+    ) -> Estimate:
+        """Get an estimate from the cache, or request it.
+
+        Returns
+        -------
+            The cached or requested estimate.
+
+        """
+        if self.cache is None:
+            return await self._request_estimate(uri, params, lazy=lazy)
+
+        key: CacheKey = (str(self._build_url(uri)), tuple(sorted(params.items())))
+        await self.cache.load(key)
+        estimate = self.cache.get(key)
+        if estimate is None and (self.cache.serve_stale or self._quota_exhausted()):
+            estimate = self.cache.get_stale(key)
+            if estimate is not None and not self._quota_exhausted():
+                self._refresh_in_background(self.cache, key, uri, params, lazy=lazy)
+        if estimate is not None:
+            return estimate
+
+        return await self._refresh(self.cache, key, uri, params, lazy=lazy)
+
+    async def _request_estimate(
+        self, uri: str, params: dict[str, str], *, lazy: bool
+    ) -> Estimate:
+        """Request an estimate and build it from the response."""
+        return await self._request(
+            uri,
             params=params,
+            build=partial(Estimate.from_dict, lazy=lazy),
         )
 
-        return Estimate.from_dict(data)
+    async def _refresh(
+        self,
+        cache: EstimateCache,
+        key: CacheKey,
+        uri: str,
+        params: dict[str, str],
+        *,
+        lazy: bool,
+    ) -> Estimate:
+        """Request an estimate and store it in the cache.
+
+        Returns
+        -------
+            The new estimate, or the cached one when the rate limit is reached,
+            or the API is unreachable and clear_sky_fallback is set.
+
+        """
+        try:
+            estimate = await self._request_estimate(uri, params, lazy=lazy)
+        except ForecastSolarRatelimitError as err:
+            self._ratelimit_reset = err.reset_at
+            if (estimate := cache.get_stale(key)) is not None:
+                return estimate
+            raise
+        except ForecastSolarConnectionError:
+            # Prefer the last real estimate over a clear sky estimate
+            if self.clear_sky_fallback and (estimate := cache.get_stale(key)):
+                return estimate
+            raise
+
+        await cache.store(key, estimate)
+        return estimate
+
+    def _refresh_in_background(
+        self,
+        cache: EstimateCache,
+        key: CacheKey,
+        uri: str,
+        params: dict[str, str],
+        *,
+        lazy: bool,
+    ) -> None:
+        """Refresh a cached estimate, unless it is already being refreshed."""
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(cache, key, uri, params, lazy=lazy))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: _task_done(self._refreshing, key, done))
 
     async def close(self) -> None:
-        """Close open client session."""
+        """Close open client session, and stop background refreshes."""
+        for task in self._refreshing.values():
+            task.cancel()
         if self.session and self._close_session:
             await self.session.close()
 
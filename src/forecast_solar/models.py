@@ -2,44 +2,572 @@
 
 from __future__ import annotations
 
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import ItemsView, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
 from enum import StrEnum
-from typing import TYPE_CHECKING, Any
+from itertools import accumulate, groupby, islice, pairwise
+from math import ceil, floor
+from operator import itemgetter, le
+from typing import TYPE_CHECKING, Any, Literal
 from zoneinfo import ZoneInfo
 
 if TYPE_CHECKING:
+    import pyarrow as pa
     from aiohttp import ClientResponse
+    from numpy.typing import NDArray
 
+SampleMethod = Literal["step", "linear"]
+SeriesName = Literal["watts", "wh_period", "wh_days"]
 
-def _timed_value(at: datetime, data: dict[datetime, int]) -> int | None:
-    """Return the value for a specific time."""
-    value = None
-    for timestamp, cur_value in data.items():
-        if timestamp > at:
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_EPOCH_NAIVE = datetime(1970, 1, 1)  # noqa: DTZ001
+_SECOND = timedelta(seconds=1)
+
+
+def _epoch(moment: datetime) -> float:
+    """Return the POSIX timestamp of a moment, treating naive times as UTC."""
+    if moment.tzinfo is None:
+        return (moment - _EPOCH_NAIVE) / _SECOND
+    return (moment - _EPOCH) / _SECOND
+
+
+def _epoch_seconds(moment: datetime) -> int:
+    """Return the whole POSIX seconds of a moment, treating naive times as UTC."""
+    if moment.tzinfo is None:
+        return (moment - _EPOCH_NAIVE) // _SECOND
+    return (moment - _EPOCH) // _SECOND
+
+
+class _DateCache(dict[str, int]):
+    """POSIX seconds of midnight UTC, parsed once per date string."""
+
+    __slots__ = ()
+
+    def __missing__(self, text: str) -> int:
+        """Parse a date that was not seen before."""
+        value = self[text] = _epoch_seconds(datetime.fromisoformat(text))
+        return value
+
+
+class _TimeCache(dict[str, tuple[int, tzinfo | None]]):
+    """Seconds since midnight UTC and timezone, parsed once per time string.
+
+    All times with the same UTC offset share a single tzinfo object.
+    """
+
+    __slots__ = ("zones",)
+
+    def __init__(self) -> None:
+        """Init an empty cache."""
+        super().__init__()
+        self.zones: dict[timedelta | None, tzinfo | None] = {}
+
+    def __missing__(self, text: str) -> tuple[int, tzinfo | None]:
+        """Parse a time of day that was not seen before."""
+        if not text:
+            value = self[text] = (0, None)
             return value
-        value = cur_value
+        moment = datetime.fromisoformat(f"1970-01-01T{text}")
+        zone = self.zones.setdefault(moment.utcoffset(), moment.tzinfo)
+        value = self[text] = (_epoch_seconds(moment), zone)
+        return value
+
+
+class _KeyCache(dict[str, tuple[int, tzinfo | None]]):
+    """POSIX seconds and timezone, parsed once per ISO 8601 timestamp.
+
+    New timestamps are split into a date and a time of day, which are
+    cached separately, so a new day only parses its date. Keys that do not
+    split that way are parsed as a whole.
+    """
+
+    __slots__ = ("dates", "times")
+
+    def __init__(self) -> None:
+        """Init an empty cache."""
+        super().__init__()
+        self.dates = _DateCache()
+        self.times = _TimeCache()
+
+    def trim(self) -> None:
+        """Forget all timestamps once the cache has outgrown its bound."""
+        if len(self) > _CACHE_SIZE:
+            self.clear()
+            self.dates.clear()
+            self.times.clear()
+
+    def __missing__(self, text: str) -> tuple[int, tzinfo | None]:
+        """Parse a timestamp that was not seen before."""
+        try:
+            seconds, zone = self.times[text[11:]]
+            value = (self.dates[text[:10]] + seconds, zone)
+        except ValueError:
+            moment = datetime.fromisoformat(text)
+            value = (_epoch_seconds(moment), moment.tzinfo)
+        self[text] = value
+        return value
+
+
+# Responses of all sites repeat the same timestamps, so they are parsed once
+# and shared by all series, up to a bound
+_CACHE_SIZE = 16384
+_KEYS = _KeyCache()
+_TIMESTAMP = itemgetter(0)
+_ZONE = itemgetter(1)
+
+
+def _decode_iso(
+    data: Mapping[str, int],
+) -> tuple[list[int], list[tzinfo | None], list[int]]:
+    """Decode the ISO 8601 keys of an API result series.
+
+    Returns the POSIX seconds, timezones and values as columns. The keys
+    are looked up in the shared cache, so every timestamp is parsed once.
+    """
+    _KEYS.trim()
+    decoded = list(map(_KEYS.__getitem__, data))
+    return (
+        list(map(_TIMESTAMP, decoded)),
+        list(map(_ZONE, decoded)),
+        list(data.values()),
+    )
+
+
+class _SeriesBuilder:
+    """Collects the entries of an API result series, one at a time.
+
+    Decodes every ISO 8601 key as it is added, with the same cache as
+    _decode_iso, so the keys do not have to be kept until the end.
+    """
+
+    __slots__ = ("timestamps", "values", "zones")
+
+    def __init__(self) -> None:
+        """Init an empty builder."""
+        _KEYS.trim()
+        self.timestamps: array[int] = array("q")
+        self.zones: list[tzinfo | None] = []
+        self.values: array[int] = array("q")
+
+    def add(self, key: str, value: float) -> None:
+        """Add the entry of an ISO 8601 timestamp."""
+        timestamp, zone = _KEYS[key]
+        self.values.append(value if isinstance(value, int) else round(value))
+        self.timestamps.append(timestamp)
+        self.zones.append(zone)
+
+    def build(self) -> _Series:
+        """Return the series of all entries added so far."""
+        return _Series(self.timestamps, self.zones, self.values)
+
+
+class _Series:
+    """Columnar time series, sorted by time.
+
+    Timestamps are stored as POSIX seconds and values as integers, both in
+    typed arrays. Values that are not integers are rounded. The timezone of
+    the original timestamps is kept once per run of equal timezones, so the
+    datetimes can be rebuilt when needed. Naive timestamps are stored as if
+    they were UTC.
+
+    A series created from raw API data with lazy set keeps the ISO 8601
+    strings and only decodes them when its columns are first accessed.
+    """
+
+    __slots__ = (
+        "_cumulative",
+        "_raw",
+        "_zone_starts",
+        "_zones",
+        "timestamps",
+        "values",
+    )
+
+    timestamps: array[int]
+    values: array[int]
+    _zone_starts: tuple[int, ...]
+    _zones: tuple[tzinfo | None, ...]
+
+    def __init__(
+        self,
+        timestamps: Sequence[int] = (),
+        zones: Sequence[tzinfo | None] = (),
+        values: Sequence[int] = (),
+        *,
+        raw: Mapping[str, int] | None = None,
+    ) -> None:
+        """Init a series from POSIX seconds, timezone and value columns.
+
+        When raw API data is given instead, it is decoded on first use.
+        """
+        self._raw = raw
+        self._cumulative: array[int] | None = None
+        if raw is None:
+            self._load(timestamps, zones, values)
+
+    @classmethod
+    def from_items(
+        cls: type[_Series], items: Iterable[tuple[datetime, float]]
+    ) -> _Series:
+        """Build a series from timestamp and value pairs."""
+        pairs = list(items)
+        return cls(
+            [_epoch_seconds(moment) for moment, _ in pairs],
+            [moment.tzinfo for moment, _ in pairs],
+            [value if isinstance(value, int) else round(value) for _, value in pairs],
+        )
+
+    @classmethod
+    def from_iso(
+        cls: type[_Series], data: Mapping[str, int] | _Series, *, lazy: bool = False
+    ) -> _Series:
+        """Build a series from an API result mapping with ISO 8601 keys.
+
+        A series that was already decoded while streaming is used as is.
+        """
+        if isinstance(data, _Series):
+            return data
+        if lazy:
+            return cls(raw=data)
+        return cls(*_decode_iso(data))
+
+    def __getattr__(self, name: str) -> Any:
+        """Decode a lazily created series on first access of its columns."""
+        if name == "_raw" or self._raw is None:
+            raise AttributeError(name)
+
+        raw, self._raw = self._raw, None
+        self._load(*_decode_iso(raw))
+        return getattr(self, name)
+
+    def _load(
+        self,
+        timestamps: Sequence[int],
+        zones: Sequence[tzinfo | None],
+        values: Sequence[int],
+    ) -> None:
+        """Fill the columns, sorting them by time when needed."""
+        if not all(map(le, timestamps, islice(timestamps, 1, None))):
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            timestamps = [timestamps[position] for position in order]
+            zones = [zones[position] for position in order]
+            values = [values[position] for position in order]
+
+        self.timestamps = array("q", timestamps)
+        try:
+            self.values = array("q", values)
+        except TypeError:
+            # Values are stored as integers, like the API returns them
+            self.values = array("q", map(round, values))
+        if not zones or zones.count(zones[0]) == len(zones):
+            # A single timezone, as in every API response
+            self._zone_starts = (0,) if zones else ()
+            self._zones = (zones[0],) if zones else ()
+            return
+
+        zone_starts: list[int] = []
+        zone_runs: list[tzinfo | None] = []
+        position = 0
+        for zone, run in groupby(zones):
+            zone_starts.append(position)
+            zone_runs.append(zone)
+            position += sum(1 for _ in run)
+        self._zone_starts = tuple(zone_starts)
+        self._zones = tuple(zone_runs)
+
+    @property
+    def cumulative(self) -> array[int]:
+        """Return the running total of the values, starting at zero.
+
+        The sum over any slice of the values is a single subtraction.
+        """
+        if self._cumulative is None:
+            self._cumulative = array("q", accumulate(self.values, initial=0))
+        return self._cumulative
+
+    def __len__(self) -> int:
+        """Return the number of entries in the series."""
+        return len(self.timestamps)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two series on their timestamps and values."""
+        if not isinstance(other, _Series):
+            return NotImplemented
+        return (
+            self.timestamps == other.timestamps
+            and self.values == other.values
+            and self.naive == other.naive
+        )
+
+    __hash__ = None
+
+    @property
+    def naive(self) -> bool:
+        """Return if the series holds naive timestamps."""
+        return bool(self._zones) and self._zones[0] is None
+
+    def datetime_at(self, index: int) -> datetime:
+        """Return the timestamp at a position as datetime."""
+        zone = self._zones[bisect_right(self._zone_starts, index) - 1]
+        return _from_epoch(self.timestamps[index], zone)
+
+    def datetimes(self) -> Iterator[datetime]:
+        """Iterate over the timestamps as datetimes."""
+        ends = (*self._zone_starts[1:], len(self.timestamps))
+        for start, end, zone in zip(self._zone_starts, ends, self._zones, strict=False):
+            for timestamp in self.timestamps[start:end]:
+                yield _from_epoch(timestamp, zone)
+
+    def to_iso(self) -> dict[str, int]:
+        """Return the series as a mapping with ISO 8601 keys, like the API."""
+        if self._raw is not None:
+            return dict(self._raw)
+        return {
+            _to_iso(moment): value
+            for moment, value in zip(self.datetimes(), self.values, strict=True)
+        }
 
-    return None
+    def index_of(self, moment: datetime) -> int | None:
+        """Return the position of an exact timestamp, if present."""
+        if not self._zones or (moment.tzinfo is None) != self.naive:
+            return None
+        timestamp = _epoch(moment)
+        position = bisect_left(self.timestamps, timestamp)
+        if position < len(self.timestamps) and self.timestamps[position] == timestamp:
+            return position
+        return None
+
+    def with_values(self, values: Iterable[int]) -> _Series:
+        """Return a series with the timestamps of this one and new values.
+
+        The timestamps are shared with this series, not copied.
+        """
+        series = _Series()
+        series.timestamps = self.timestamps
+        series.values = array("q", values)
+        series._zone_starts = self._zone_starts
+        series._zones = self._zones
+        return series
+
+    def scaled(self, factor: float) -> _Series:
+        """Return the series with every value multiplied by a factor."""
+        return self.with_values([round(value * factor) for value in self.values])
+
+
+@dataclass(frozen=True, slots=True)
+class _DayLayout:
+    """Position of every entry of a power series within its day.
+
+    Attributes
+    ----------
+        morning: Weight of the morning damping, 1 at the first entry of a
+            day, falling linearly to 0 halfway between its first and last.
+        evening: Weight of the evening damping, rising linearly from 0
+            halfway through a day to 1 at its last entry.
+        hours: Hours since the previous entry, 0 for the first of a day.
+        days: Start and end position of every day.
+        day_timestamps: POSIX seconds of the midnight of every day.
+
+    """
+
+    morning: list[float]
+    evening: list[float]
+    hours: list[float]
+    days: list[tuple[int, int]]
+    day_timestamps: list[int]
+
+
+def _day_layout(series: _Series, zone: tzinfo) -> _DayLayout:
+    """Return the position of the entries of a power series within their day.
+
+    Days are those of the timezone of the site, also for timestamps in UTC.
+    """
+    timestamps = series.timestamps
+    morning = [0.0] * len(timestamps)
+    evening = [0.0] * len(timestamps)
+    hours = [0.0] * len(timestamps)
+    days: list[tuple[int, int]] = []
+    day_timestamps: list[int] = []
+    for day, group in groupby(
+        enumerate(timestamps),
+        key=lambda item: datetime.fromtimestamp(item[1], zone).date(),
+    ):
+        positions = [position for position, _ in group]
+        start, end = positions[0], positions[-1] + 1
+        days.append((start, end))
+        day_timestamps.append(_epoch_seconds(datetime.combine(day, time())))
+        first, last = timestamps[start], timestamps[end - 1]
+        half = (last - first) / 2
+        for position in range(start + 1, end):
+            timestamp = timestamps[position]
+            hours[position] = (timestamp - timestamps[position - 1]) / 3600
+            morning[position] = max(0, 1 - (timestamp - first) / half)
+            evening[position] = max(0, 1 - (last - timestamp) / half)
+        if half:
+            morning[start] = evening[end - 1] = 1
+    return _DayLayout(morning, evening, hours, days, day_timestamps)
+
+
+def _to_iso(moment: datetime) -> str:
+    """Return an ISO 8601 key, a date for naive midnights like the API."""
+    if moment.tzinfo is None and moment == datetime.combine(moment, time()):
+        return moment.date().isoformat()
+    return moment.isoformat()
+
+
+def _from_epoch(timestamp: int, zone: tzinfo | None) -> datetime:
+    """Return a datetime for a POSIX timestamp in a timezone."""
+    if zone is None:
+        return datetime.fromtimestamp(timestamp, UTC).replace(tzinfo=None)
+    return datetime.fromtimestamp(timestamp, zone)
+
+
+class _SeriesItems(ItemsView[datetime, int]):
+    """Items view that walks the columns instead of looking up every key."""
+
+    _mapping: _SeriesView
+
+    def __iter__(self) -> Iterator[tuple[datetime, int]]:
+        """Iterate over the timestamp and value pairs."""
+        series = self._mapping.series
+        return zip(series.datetimes(), series.values, strict=True)
+
+
+class _SeriesView(Mapping[datetime, int]):
+    """Read-only dict-style view on a series.
+
+    Datetimes are only created while the view is being read, the series
+    itself keeps no per entry Python objects.
+    """
+
+    __slots__ = ("series",)
+
+    def __init__(self, series: _Series) -> None:
+        """Init a view on a series."""
+        self.series = series
+
+    def __getitem__(self, key: datetime) -> int:
+        """Return the value for an exact timestamp."""
+        position = self.series.index_of(key)
+        if position is None:
+            raise KeyError(key)
+        return self.series.values[position]
+
+    def __iter__(self) -> Iterator[datetime]:
+        """Iterate over the timestamps."""
+        return self.series.datetimes()
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.series)
+
+    def __repr__(self) -> str:
+        """Return the representation of the equivalent dict."""
+        return repr(dict(self.items()))
+
+    def items(self) -> _SeriesItems:
+        """Return a view on the timestamp and value pairs."""
+        return _SeriesItems(self)
+
+
+def _as_series(data: Mapping[datetime, float] | _Series) -> _Series:
+    """Return a series for a timestamp to value mapping."""
+    if isinstance(data, _Series):
+        return data
+    return _Series.from_items(data.items())
+
+
+def _timed_value(at: datetime, series: _Series) -> int | None:
+    """Return the value for a specific time.
+
+    Times before the first or at/after the last timestamp have no value.
+    """
+    position = bisect_right(series.timestamps, _epoch(at))
+    if position in (0, len(series)):
+        return None
+
+    return series.values[position - 1]
 
 
 def _interval_value_sum(
-    interval_begin: datetime, interval_end: datetime, data: dict[datetime, int]
+    interval_begin: datetime, interval_end: datetime, series: _Series
 ) -> int:
     """Return the sum of values in interval."""
-    total = 0
+    begin = bisect_left(series.timestamps, _epoch(interval_begin))
+    end = bisect_left(series.timestamps, _epoch(interval_end), lo=begin)
 
-    for timestamp, wh in data.items():
-        # Skip all until this hour
-        if timestamp < interval_begin:
-            continue
+    return series.cumulative[end] - series.cumulative[begin]
+
+
+def _sample_grid(start: datetime, end: datetime, step: timedelta) -> list[float]:
+    """Return the POSIX timestamps bounding each interval of a time grid.
 
-        if timestamp >= interval_end:
-            break
+    The grid holds every start + n * step before end, followed by the end
+    of the last interval.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        msg = "start and end must be timezone aware"
+        raise ValueError(msg)
+    if step <= timedelta(0):
+        msg = "step must be positive"
+        raise ValueError(msg)
+
+    first = _epoch(start)
+    seconds = step / _SECOND
+    count = max(ceil((_epoch(end) - first) / seconds), 0)
+    return [first + seconds * position for position in range(count + 1)]
+
+
+def _sample_series(
+    series: _Series, boundaries: list[float], *, linear: bool
+) -> tuple[list[float], list[float]]:
+    """Return power and energy of a series on a time grid.
+
+    Walks the grid and the series together once. Power is taken from the
+    step or linearly interpolated curve through the series, energy is the
+    integral of that curve over each grid interval in Wh.
+    """
+    timestamps = series.timestamps
+    values = series.values
+    count = len(timestamps)
+    position = 0
+    total = 0.0
+    power: list[float] = []
+    integral: list[float] = []
+
+    for moment in boundaries:
+        while position < count and timestamps[position] <= moment:
+            if position > 0:
+                elapsed = timestamps[position] - timestamps[position - 1]
+                if linear:
+                    total += (values[position - 1] + values[position]) / 2 * elapsed
+                else:
+                    total += values[position - 1] * elapsed
+            position += 1
+
+        if position in (0, count):
+            power.append(0.0)
+            integral.append(total)
+            continue
 
-        total += wh
+        start = timestamps[position - 1]
+        elapsed = moment - start
+        value = float(values[position - 1])
+        if linear:
+            slope = (values[position] - value) / (timestamps[position] - start)
+            current = value + slope * elapsed
+            integral.append(total + (value + current) / 2 * elapsed)
+        else:
+            current = value
+            integral.append(total + value * elapsed)
+        power.append(current)
 
-    return total
+    energy = [(end - begin) / 3600 for begin, end in pairwise(integral)]
+    return power[:-1], energy
 
 
 class AccountType(StrEnum):
@@ -67,23 +595,163 @@ class Plane:
     kwp: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class EstimateSnapshot:
+    """All summary metrics of an estimate at a single moment.
+
+    Attributes
+    ----------
+        at: The moment the metrics were evaluated for, in the API timezone.
+        power_production_now: Estimated power production at that moment.
+        energy_current_hour: Estimated energy production for the hour.
+        energy_production_today: Estimated energy production for the day.
+        energy_production_today_remaining: Estimated energy production for
+            the rest of the day.
+        energy_production_tomorrow: Estimated energy production for the
+            next day.
+        power_highest_peak_time_today: Moment with the highest power
+            production of the day.
+        power_highest_peak_time_tomorrow: Moment with the highest power
+            production of the next day.
+
+    """
+
+    at: datetime
+    power_production_now: int
+    energy_current_hour: int
+    energy_production_today: int
+    energy_production_today_remaining: int
+    energy_production_tomorrow: int
+    power_highest_peak_time_today: datetime | None
+    power_highest_peak_time_tomorrow: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class EstimateSample:
+    """Power and energy of an estimate on a regular time grid.
+
+    Attributes
+    ----------
+        timestamps: Start of every grid interval.
+        power: Estimated power production at the start of every interval.
+        energy: Estimated energy production during every interval in Wh.
+
+    """
+
+    timestamps: list[datetime]
+    power: list[float]
+    energy: list[float]
+
+
+@dataclass(frozen=True, slots=True)
+class DaySummary:
+    """Summary of the estimated production for a single day.
+
+    Attributes
+    ----------
+        day: The date in the API timezone.
+        energy_production: Estimated energy production for the day.
+        peak_time: Moment with the highest power production, if known.
+        peak_power: The highest estimated power production of the day.
+
+    """
+
+    day: date
+    energy_production: int
+    peak_time: datetime | None
+    peak_power: int
+
+
 class Estimate:
     """Object holding estimate forecast results from Forecast.Solar.
 
+    The series are stored column-wise in typed arrays, the dict-style
+    attributes are read-only views on them.
+
     Attributes
     ----------
         watts: Estimated solar power output per time period.
         wh_period: Estimated solar energy production differences per hour.
         wh_days: Estimated solar energy production per day.
+        synthetic: Computed locally from a clear sky model, instead of
+            fetched from the API.
 
     """
 
-    watts: dict[datetime, int]
-    wh_period: dict[datetime, int]
-    wh_days: dict[datetime, int]
-    api_rate_limit: int
-    api_timezone: str
+    __slots__ = (
+        "_days",
+        "_layout",
+        "_production",
+        "_tzinfo",
+        "_watts",
+        "_wh_days",
+        "_wh_period",
+        "api_rate_limit",
+        "api_timezone",
+        "synthetic",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        watts: Mapping[datetime, float] | _Series,
+        wh_period: Mapping[datetime, float] | _Series,
+        wh_days: Mapping[datetime, float] | _Series,
+        api_rate_limit: int,
+        api_timezone: str,
+        *,
+        synthetic: bool = False,
+    ) -> None:
+        """Init an estimate from timestamp to value mappings."""
+        self._watts = _as_series(watts)
+        self._wh_period = _as_series(wh_period)
+        self._wh_days = _as_series(wh_days)
+        self.api_rate_limit = api_rate_limit
+        self.api_timezone = api_timezone
+        self.synthetic = synthetic
+        self._days: dict[date, tuple[int, int, DaySummary]] | None = None
+        self._layout: _DayLayout | None = None
+        self._production: dict[date, int] | None = None
+        self._tzinfo: ZoneInfo | None = None
+
+    def __repr__(self) -> str:
+        """Return the representation of the estimate."""
+        return (
+            f"{type(self).__name__}(watts={self.watts!r}, "
+            f"wh_period={self.wh_period!r}, wh_days={self.wh_days!r}, "
+            f"api_rate_limit={self.api_rate_limit!r}, "
+            f"api_timezone={self.api_timezone!r}"
+            f"{', synthetic=True' if self.synthetic else ''})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two estimates."""
+        if not isinstance(other, Estimate):
+            return NotImplemented
+        return (
+            self._watts == other._watts
+            and self._wh_period == other._wh_period
+            and self._wh_days == other._wh_days
+            and self.api_rate_limit == other.api_rate_limit
+            and self.api_timezone == other.api_timezone
+            and self.synthetic == other.synthetic
+        )
+
+    __hash__ = None
+
+    @property
+    def watts(self) -> Mapping[datetime, int]:
+        """Return estimated solar power output per time period."""
+        return _SeriesView(self._watts)
+
+    @property
+    def wh_period(self) -> Mapping[datetime, int]:
+        """Return estimated solar energy production differences per hour."""
+        return _SeriesView(self._wh_period)
+
+    @property
+    def wh_days(self) -> Mapping[datetime, int]:
+        """Return estimated solar energy production per day."""
+        return _SeriesView(self._wh_days)
 
     @property
     def timezone(self) -> str:
@@ -112,12 +780,7 @@ class Estimate:
     @property
     def energy_production_today_remaining(self) -> int:
         """Return estimated energy produced in rest of today."""
-        return _interval_value_sum(
-            self.now(),
-            self.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            + timedelta(days=1),
-            self.wh_period,
-        )
+        return self._energy_today_remaining(self.now())
 
     @property
     def power_production_now(self) -> int:
@@ -137,50 +800,379 @@ class Estimate:
     @property
     def energy_current_hour(self) -> int:
         """Return the estimated energy production for the current hour."""
-        return _interval_value_sum(
-            self.now().replace(minute=0, second=0, microsecond=0),
-            self.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1),
-            self.wh_period,
-        )
+        return self._energy_hour(self.now())
 
     def day_production(self, specific_date: date) -> int:
         """Return the day production."""
-        for timestamp, production in self.wh_days.items():
-            if timestamp.date() == specific_date:
-                return production
+        return self._day_production().get(specific_date, 0)
+
+    def days(self) -> Iterator[DaySummary]:
+        """Iterate over the per-day summaries, in date order."""
+        for _, _, summary in self._day_index().values():
+            yield summary
 
-        return 0
+    def energy_between(self, start: datetime, end: datetime) -> int:
+        """Return the estimated energy produced between two moments.
+
+        Sums the energy of all periods with a timestamp from start up to,
+        but not including, end.
+        """
+        return _interval_value_sum(start, end, self._wh_period)
 
     def now(self) -> datetime:
         """Return the current timestamp in the API timezone."""
-        return datetime.now(tz=ZoneInfo(self.api_timezone))
+        return datetime.now(tz=self._zone())
 
     def peak_production_time(self, specific_date: date) -> datetime | None:
         """Return the peak time on a specific date."""
-        peak = max(
-            (
-                (timestamp, watt)
-                for timestamp, watt in self.watts.items()
-                if timestamp.date() == specific_date
-            ),
-            key=lambda item: item[1],
-            default=None,
-        )
-        return peak[0] if peak is not None else None
+        entry = self._day_index().get(specific_date)
+        return entry[2].peak_time if entry is not None else None
 
     def power_production_at_time(self, time: datetime) -> int:
         """Return estimated power production at a specific time."""
-        return _timed_value(time, self.watts) or 0
+        return _timed_value(time, self._watts) or 0
+
+    def sample(
+        self,
+        start: datetime,
+        end: datetime,
+        step: timedelta,
+        method: SampleMethod = "step",
+    ) -> EstimateSample:
+        """Return power and energy on a regular time grid.
+
+        Args:
+        ----
+            start: Start of the first grid interval, timezone aware.
+            end: End of the grid, the last interval starts before it.
+            step: Length of the grid intervals.
+            method: Use the "step" function through the power values, like
+                power_production_at_time, or "linear" interpolation.
+
+        Returns:
+        -------
+            An EstimateSample object.
+
+        """
+        boundaries = _sample_grid(start, end, step)
+        power, energy = _sample_series(
+            self._watts, boundaries, linear=_is_linear(method)
+        )
+        zone = start.tzinfo
+        return EstimateSample(
+            timestamps=[
+                datetime.fromtimestamp(moment, zone) for moment in boundaries[:-1]
+            ],
+            power=power,
+            energy=energy,
+        )
+
+    def sample_numpy(
+        self,
+        start: datetime,
+        end: datetime,
+        step: timedelta,
+        method: SampleMethod = "step",
+    ) -> tuple[NDArray[Any], NDArray[Any], NDArray[Any]]:
+        """Return power and energy on a regular time grid as NumPy arrays.
+
+        Vectorized variant of sample, which requires NumPy to be installed.
+
+        Returns
+        -------
+            The POSIX timestamps (int64), power and energy (float64) arrays.
+
+        """
+        from ._numpy import sample_series  # noqa: PLC0415
+
+        return sample_series(
+            self._watts,
+            _sample_grid(start, end, step),
+            linear=_is_linear(method),
+        )
+
+    def transform(
+        self,
+        *,
+        damping_morning: float = 0,
+        damping_evening: float = 0,
+        inverter: float | None = None,
+    ) -> Estimate:
+        """Return the estimate with damping and an inverter limit applied.
+
+        Evaluates what the API would return for other damping or inverter
+        settings, without a request. Start from an estimate that was
+        requested without damping and inverter. The damping falls linearly
+        from its full value at the first and last entry of a day to none
+        halfway in between. The power is clipped to the inverter limit, and
+        the energy per period and per day are integrated again from the new
+        power curve, like the API does.
+
+        Days are those of api_timezone, also when the timestamps are in UTC.
+        The position of every entry within its day is computed once per
+        estimate, so many variants of the same estimate are cheap.
+
+        Args:
+        ----
+            damping_morning: Damping of the morning, between 0 and 1.
+            damping_evening: Damping of the evening, between 0 and 1.
+            inverter: Maximum power of the inverter in kW.
+
+        Returns:
+        -------
+            A new Estimate object.
+
+        Raises:
+        ------
+            ValueError: If a damping is not between 0 and 1.
+
+        """
+        if not (0 <= damping_morning <= 1 and 0 <= damping_evening <= 1):
+            msg = "Damping must be between 0 and 1"
+            raise ValueError(msg)
+        if self._layout is None:
+            self._layout = _day_layout(self._watts, self._zone())
+        layout = self._layout
+
+        limit = sys.maxsize if inverter is None else round(inverter * 1000)
+        watts = [
+            min(
+                limit,
+                round(
+                    value * (1 - damping_morning * morning - damping_evening * evening)
+                ),
+            )
+            for value, morning, evening in zip(
+                self._watts.values, layout.morning, layout.evening, strict=True
+            )
+        ]
+        # The API rounds the energy of a period half up
+        energy = [
+            floor((previous + current) / 2 * hours + 0.5)
+            for previous, current, hours in zip(
+                [0, *watts], watts, layout.hours, strict=False
+            )
+        ]
+        return Estimate(
+            watts=self._watts.with_values(watts),
+            wh_period=self._watts.with_values(energy),
+            wh_days=_Series(
+                layout.day_timestamps,
+                [None] * len(layout.days),
+                [sum(energy[start:end]) for start, end in layout.days],
+            ),
+            api_rate_limit=self.api_rate_limit,
+            api_timezone=self.api_timezone,
+            synthetic=self.synthetic,
+        )
+
+    def to_numpy(
+        self, series: SeriesName = "watts"
+    ) -> tuple[NDArray[Any], NDArray[Any]]:
+        """Return a series as NumPy arrays, which requires NumPy.
+
+        The arrays are read-only views on the parsed data, without a Python
+        object per entry. Naive timestamps, like the days of wh_days, are
+        POSIX seconds as if they were UTC.
+
+        Args:
+        ----
+            series: The series to return, "watts", "wh_period" or "wh_days".
+
+        Returns:
+        -------
+            The POSIX timestamps and values, both int64 arrays.
+
+        """
+        from ._numpy import series_columns  # noqa: PLC0415
+
+        return series_columns(self._series(series))
+
+    def to_arrow(self, series: SeriesName = "watts") -> pa.Table:
+        """Return a series as an Arrow table, which requires PyArrow.
+
+        Args:
+        ----
+            series: The series to return, "watts", "wh_period" or "wh_days".
+
+        Returns:
+        -------
+            A table with a "timestamp" column in seconds, without timezone
+            for naive timestamps, and an int64 "value" column.
+
+        """
+        from ._arrow import series_table  # noqa: PLC0415
+
+        return series_table(self._series(series))
+
+    @classmethod
+    def stack_numpy(
+        cls: type[Estimate], estimates: Iterable[Estimate], series: SeriesName = "watts"
+    ) -> tuple[NDArray[Any], NDArray[Any]]:
+        """Return a series of many estimates as a single NumPy array.
+
+        The rows are aligned on the sorted union of the timestamps of all
+        estimates, a row holds NaN where its estimate has no value.
+
+        Args:
+        ----
+            estimates: The estimates to stack, one row per estimate.
+            series: The series to stack, "watts", "wh_period" or "wh_days".
+
+        Returns:
+        -------
+            The POSIX timestamps (int64) and a 2-D array of values (float64).
+
+        """
+        from ._numpy import stack_series  # noqa: PLC0415
+
+        return stack_series([cls._series(item, series) for item in estimates])
+
+    def scaled(self, factor: float) -> Estimate:
+        """Return the estimate with every value multiplied by a factor.
+
+        Forecast.Solar estimates scale linearly with the size of the solar
+        panels, so an estimate for 1 kWp scaled by the kWp of a site equals
+        the estimate for that site.
+
+        Args:
+        ----
+            factor: The factor to multiply the power and energy values by.
+
+        Returns:
+        -------
+            A new Estimate object, sharing the timestamps of this one.
+
+        """
+        return Estimate(
+            watts=self._watts.scaled(factor),
+            wh_period=self._wh_period.scaled(factor),
+            wh_days=self._wh_days.scaled(factor),
+            api_rate_limit=self.api_rate_limit,
+            api_timezone=self.api_timezone,
+            synthetic=self.synthetic,
+        )
+
+    def snapshot(self, at: datetime | None = None) -> EstimateSnapshot:
+        """Return all summary metrics evaluated at a single moment.
+
+        Args:
+        ----
+            at: The moment to evaluate the metrics for, defaults to now.
+
+        Returns:
+        -------
+            An EstimateSnapshot object.
+
+        """
+        now = self.now() if at is None else at.astimezone(self._zone())
+        days = self._day_index()
+        today = days.get(now.date())
+        tomorrow = days.get(now.date() + timedelta(days=1))
+
+        return EstimateSnapshot(
+            at=now,
+            power_production_now=self.power_production_at_time(now),
+            energy_current_hour=self._energy_hour(now),
+            energy_production_today=(
+                today[2].energy_production if today is not None else 0
+            ),
+            energy_production_today_remaining=self._energy_today_remaining(now),
+            energy_production_tomorrow=(
+                tomorrow[2].energy_production if tomorrow is not None else 0
+            ),
+            power_highest_peak_time_today=(
+                today[2].peak_time if today is not None else None
+            ),
+            power_highest_peak_time_tomorrow=(
+                tomorrow[2].peak_time if tomorrow is not None else None
+            ),
+        )
 
     def sum_energy_production(self, period_hours: int) -> int:
         """Return the sum of the energy production."""
         now = self.now().replace(minute=59, second=59, microsecond=999)
         until = now + timedelta(hours=period_hours)
 
-        return _interval_value_sum(now, until, self.wh_period)
+        return self.energy_between(now, until)
+
+    def _zone(self) -> ZoneInfo:
+        """Return the API timezone, creating it only once."""
+        if self._tzinfo is None or self._tzinfo.key != self.api_timezone:
+            self._tzinfo = ZoneInfo(self.api_timezone)
+        return self._tzinfo
+
+    def _series(self, name: SeriesName) -> _Series:
+        """Return a series by its attribute name."""
+        if name not in ("watts", "wh_period", "wh_days"):
+            msg = f"Unknown series: {name}"
+            raise ValueError(msg)
+        return getattr(self, f"_{name}")
+
+    def _energy_hour(self, now: datetime) -> int:
+        """Return the estimated energy production for the hour of a moment."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        return self.energy_between(hour, hour + timedelta(hours=1))
+
+    def _energy_today_remaining(self, now: datetime) -> int:
+        """Return the estimated energy production for the rest of a day."""
+        return self.energy_between(
+            now,
+            now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
+        )
+
+    def _day_production(self) -> dict[date, int]:
+        """Return the energy production per date, building it on first use."""
+        if self._production is None:
+            self._production = {}
+            for moment, energy in self.wh_days.items():
+                self._production.setdefault(moment.date(), energy)
+        return self._production
+
+    def _day_index(self) -> dict[date, tuple[int, int, DaySummary]]:
+        """Return the per-day index, building it on first use.
+
+        Maps each date to the bounds of its slice in the watts series and
+        the summary of that day.
+        """
+        if self._days is not None:
+            return self._days
+
+        production = self._day_production()
+
+        peaks: dict[date, tuple[int, int, datetime, int]] = {}
+        values = self._watts.values
+        for day, group in groupby(
+            enumerate(self._watts.datetimes()), key=lambda item: item[1].date()
+        ):
+            entries = list(group)
+            peak_position, peak_time = max(entries, key=lambda item: values[item[0]])
+            peaks[day] = (
+                entries[0][0],
+                entries[-1][0] + 1,
+                peak_time,
+                values[peak_position],
+            )
+
+        self._days = {}
+        for day in sorted(production.keys() | peaks.keys()):
+            start, end, peak_time, peak_power = peaks.get(day, (0, 0, None, 0))
+            self._days[day] = (
+                start,
+                end,
+                DaySummary(
+                    day=day,
+                    energy_production=production.get(day, 0),
+                    peak_time=peak_time,
+                    peak_power=peak_power,
+                ),
+            )
+        return self._days
 
     @classmethod
-    def from_dict(cls: type[Estimate], data: dict[str, Any]) -> Estimate:
+    def from_dict(
+        cls: type[Estimate], data: dict[str, Any], *, lazy: bool = False
+    ) -> Estimate:
         """Return a Estimate object from a Forecast.Solar API response.
 
         Converts a dictionary, obtained from the Forecast.Solar API into
@@ -189,28 +1181,55 @@ class Estimate:
         Args:
         ----
             data: The estimate response from the Forecast.Solar API.
+            lazy: Keep the timestamps of every series as ISO 8601 strings,
+                until the series is first used.
 
         Returns:
         -------
             An Estimate object.
 
         """
+        result = data["result"]
         return cls(
-            watts={
-                datetime.fromisoformat(d): w for d, w in data["result"]["watts"].items()
-            },
-            wh_period={
-                datetime.fromisoformat(d): e
-                for d, e in data["result"]["watt_hours_period"].items()
-            },
-            wh_days={
-                datetime.fromisoformat(d): e
-                for d, e in data["result"]["watt_hours_day"].items()
-            },
+            watts=_Series.from_iso(result["watts"], lazy=lazy),
+            wh_period=_Series.from_iso(result["watt_hours_period"], lazy=lazy),
+            wh_days=_Series.from_iso(result["watt_hours_day"], lazy=lazy),
             api_rate_limit=data["message"]["ratelimit"]["limit"],
             api_timezone=data["message"]["info"]["timezone"],
+            synthetic=data["message"]["info"].get("synthetic", False),
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return the estimate in the format of a Forecast.Solar API response.
+
+        Returns
+        -------
+            A dictionary that from_dict turns back into an equal estimate.
+
+        """
+        info: dict[str, Any] = {"timezone": self.api_timezone}
+        if self.synthetic:
+            info["synthetic"] = True
+        return {
+            "result": {
+                "watts": self._watts.to_iso(),
+                "watt_hours_period": self._wh_period.to_iso(),
+                "watt_hours_day": self._wh_days.to_iso(),
+            },
+            "message": {
+                "ratelimit": {"limit": self.api_rate_limit},
+                "info": info,
+            },
+        }
+
+
+def _is_linear(method: SampleMethod) -> bool:
+    """Return if a sample method interpolates linearly."""
+    if method not in ("step", "linear"):
+        msg = f"Unknown sample method: {method}"
+        raise ValueError(msg)
+    return method == "linear"
+
 
 @dataclass
 class Ratelimit:
@@ -0,0 +1,204 @@
+"""Instrumentation of Forecast.Solar requests."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Protocol
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    """Measurements of a single request to the Forecast.Solar API.
+
+    All durations are in seconds.
+
+    Attributes
+    ----------
+        url_template: The requested URL, without site parameters and API key.
+        status: HTTP status of the response, None when there was none.
+        bytes_received: Size of the response body.
+        headers_time: Time until the response headers were received.
+        read_time: Time to read the response body.
+        decode_time: Time to decode the JSON response.
+        build_time: Time to build the model from the decoded response.
+        ratelimit_remaining: Remaining calls reported by the API, if any.
+        error: The exception raised for the request, if any.
+
+    """
+
+    url_template: str
+    status: int | None = None
+    bytes_received: int = 0
+    headers_time: float = 0
+    read_time: float = 0
+    decode_time: float = 0
+    build_time: float = 0
+    ratelimit_remaining: int | None = None
+    error: BaseException | None = None
+
+
+class RequestObserver(Protocol):
+    """Receives the measurements of every request that was sent."""
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        """Handle the measurements of a finished request.
+
+        Args:
+        ----
+            metrics: The measurements of the request.
+
+        """
+
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+@dataclass
+class Histogram:
+    """Distribution of durations over fixed buckets.
+
+    Attributes
+    ----------
+        buckets: Upper bounds of the buckets, in seconds. Larger durations
+            are counted in an extra, unbounded bucket.
+        counts: Number of durations per bucket.
+        count: Number of durations.
+        total: Sum of the durations.
+
+    """
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0
+
+    def __post_init__(self) -> None:
+        """Create a count for every bucket."""
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def add(self, duration: float) -> None:
+        """Count a duration.
+
+        Args:
+        ----
+            duration: The duration in seconds.
+
+        """
+        self.counts[bisect_left(self.buckets, duration)] += 1
+        self.count += 1
+        self.total += duration
+
+    @property
+    def mean(self) -> float:
+        """Return the mean duration, 0 when nothing was counted."""
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket containing a quantile.
+
+        Args:
+        ----
+            fraction: The quantile, between 0 and 1.
+
+        Returns:
+        -------
+            The upper bound in seconds, infinite for the unbounded bucket.
+
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(
+            (*self.buckets, float("inf")), self.counts, strict=True
+        ):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return 0
+
+
+@dataclass
+class RequestStats:
+    """Counters and histograms of the requests to one URL template.
+
+    Attributes
+    ----------
+        requests: Number of requests.
+        bytes_received: Total size of the response bodies.
+        statuses: Number of responses per HTTP status.
+        errors: Number of exceptions per exception type.
+        ratelimit_remaining: Remaining calls reported by the last response.
+        headers_time: Histogram of the time until the response headers.
+        read_time: Histogram of the time to read the response body.
+        decode_time: Histogram of the time to decode the JSON response.
+        build_time: Histogram of the time to build the model.
+
+    """
+
+    requests: int = 0
+    bytes_received: int = 0
+    statuses: Counter[int] = field(default_factory=Counter)
+    errors: Counter[str] = field(default_factory=Counter)
+    ratelimit_remaining: int | None = None
+    headers_time: Histogram = field(default_factory=Histogram)
+    read_time: Histogram = field(default_factory=Histogram)
+    decode_time: Histogram = field(default_factory=Histogram)
+    build_time: Histogram = field(default_factory=Histogram)
+
+
+@dataclass
+class MetricsAggregator:
+    """Request observer that keeps counters and histograms per URL template.
+
+    Attributes
+    ----------
+        stats: The statistics per URL template.
+
+    """
+
+    stats: defaultdict[str, RequestStats] = field(
+        default_factory=lambda: defaultdict(RequestStats)
+    )
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        """Add the measurements of a request to the statistics.
+
+        Args:
+        ----
+            metrics: The measurements of the request.
+
+        """
+        stats = self.stats[metrics.url_template]
+        stats.requests += 1
+        stats.bytes_received += metrics.bytes_received
+        if metrics.status is not None:
+            stats.statuses[metrics.status] += 1
+            stats.headers_time.add(metrics.headers_time)
+        if metrics.error is not None:
+            stats.errors[type(metrics.error).__name__] += 1
+            return
+        if metrics.ratelimit_remaining is not None:
+            stats.ratelimit_remaining = metrics.ratelimit_remaining
+        stats.read_time.add(metrics.read_time)
+        stats.decode_time.add(metrics.decode_time)
+        stats.build_time.add(metrics.build_time)
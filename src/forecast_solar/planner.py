@@ -0,0 +1,317 @@
+"""Planning which site to refresh next, within the rate limit of one API key."""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import count
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from .models import Ratelimit
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedRefresh:
+    """A refresh decided by a RefreshPlanner.
+
+    Attributes
+    ----------
+        key: The key of the site to refresh.
+        at: The moment the estimate of the site may be requested.
+
+    """
+
+    key: Hashable
+    at: datetime
+
+
+@dataclass(slots=True)
+class _PlannedSite:
+    """Weights and refresh state of a single site.
+
+    The refresh moment is when the refresh was due rather than done while
+    the rate limit cannot keep up, like the pass of stride scheduling.
+    """
+
+    max_age: float
+    priority: float
+    activity: float
+    refreshed_at: float | None
+    version: int = 0
+
+    @property
+    def weight(self) -> float:
+        """Return the refreshes per second the site asks for."""
+        return self.priority * self.activity / self.max_age
+
+    def due(self) -> float:
+        """Return the moment the site should be refreshed, as POSIX seconds.
+
+        Sites that were never refreshed are due before all others, the
+        heaviest first.
+        """
+        if self.refreshed_at is None:
+            return -self.weight
+        return self.refreshed_at + 1 / self.weight
+
+
+@dataclass
+class RefreshPlanner:
+    """Decide which site to refresh next, without exceeding the rate limit.
+
+    Every site should be refreshed max_age after its last refresh, divided
+    by its priority and its solar activity. Sites are kept in a heap on that
+    moment, so every decision takes O(log n) time. When the rate limit
+    cannot keep up with the sites, the site that is the most overdue
+    relative to its weights is refreshed first, so all sites age in
+    proportion to their weights. Sites with no solar activity, for example
+    at night, are not refreshed at all.
+
+    Requests are spread evenly at call_limit per period, and the remaining
+    calls observed in a response are never exceeded before the rate limit
+    resets, so no request is rejected with ForecastSolarRatelimitError as
+    long as all requests of the API key follow the plan.
+
+    Attributes
+    ----------
+        call_limit: Number of requests allowed per period, until it is
+            observed in a response.
+        period: Length of the rate limit period in seconds, until it is
+            observed in a response.
+
+    """
+
+    call_limit: int = 12
+    period: int = 3600
+    _sites: dict[Hashable, _PlannedSite] = field(default_factory=dict, repr=False)
+    _heap: list[tuple[float, int, Hashable]] = field(default_factory=list, repr=False)
+    _sequence: count[int] = field(default_factory=count, repr=False)
+    _next_call: float | None = field(default=None, repr=False)
+    _remaining: int | None = field(default=None, repr=False)
+    _resets_at: float | None = field(default=None, repr=False)
+    _virtual: float | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        """Validate the planner configuration.
+
+        Raises
+        ------
+            ValueError: If call_limit or period is not positive.
+
+        """
+        if min(self.call_limit, self.period) < 1:
+            msg = "call_limit and period must be at least 1"
+            raise ValueError(msg)
+
+    def __len__(self) -> int:
+        """Return the number of planned sites."""
+        return len(self._sites)
+
+    def __contains__(self, key: object) -> bool:
+        """Return if a site is planned."""
+        return key in self._sites
+
+    def add(
+        self,
+        key: Hashable,
+        *,
+        max_age: timedelta = timedelta(hours=1),
+        priority: float = 1,
+        activity: float = 1,
+        refreshed_at: datetime | None = None,
+    ) -> None:
+        """Add a site to the plan, or replace it.
+
+        Args:
+        ----
+            key: The key of the site, returned in the planned refreshes.
+            max_age: Age at which an estimate of the site is stale.
+            priority: Relative importance of the site, 2 is refreshed
+                twice as often as 1.
+            activity: Relative solar activity of the site, 0 while the sun
+                is down.
+            refreshed_at: Moment the site was last refreshed, never when None.
+
+        Raises:
+        ------
+            ValueError: If max_age or priority is not positive, or the
+                activity is negative.
+
+        """
+        if max_age <= timedelta(0) or priority <= 0 or activity < 0:
+            msg = "max_age and priority must be positive, activity at least 0"
+            raise ValueError(msg)
+        site = _PlannedSite(
+            max_age.total_seconds(),
+            priority,
+            activity,
+            None if refreshed_at is None else refreshed_at.timestamp(),
+        )
+        self._sites[key] = site
+        self._push(key, site)
+
+    def update(
+        self,
+        key: Hashable,
+        *,
+        priority: float | None = None,
+        activity: float | None = None,
+        refreshed_at: datetime | None = None,
+    ) -> None:
+        """Change the weights or last refresh of a site.
+
+        Args:
+        ----
+            key: The key of the site.
+            priority: The new priority, unchanged when None.
+            activity: The new solar activity, unchanged when None.
+            refreshed_at: The new moment of the last refresh, unchanged
+                when None.
+
+        Raises:
+        ------
+            KeyError: If the site is not planned.
+            ValueError: If the priority is not positive, or the activity is
+                negative.
+
+        """
+        site = self._sites[key]
+        if (priority is not None and priority <= 0) or (
+            activity is not None and activity < 0
+        ):
+            msg = "priority must be positive, activity at least 0"
+            raise ValueError(msg)
+        if priority is not None:
+            site.priority = priority
+        if activity is not None:
+            site.activity = activity
+        if refreshed_at is not None:
+            site.refreshed_at = refreshed_at.timestamp()
+        self._push(key, site)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a site from the plan.
+
+        Raises
+        ------
+            KeyError: If the site is not planned.
+
+        """
+        del self._sites[key]
+
+    def observe(self, ratelimit: Ratelimit, at: datetime | None = None) -> None:
+        """Update the rate limit from a response of the API key.
+
+        Args:
+        ----
+            ratelimit: The rate limit parsed from the response.
+            at: Moment of the response, now when None.
+
+        """
+        now = (at or datetime.now(UTC)).timestamp()
+        if ratelimit.call_limit > 0 and ratelimit.period > 0:
+            self.call_limit = ratelimit.call_limit
+            self.period = ratelimit.period
+        self._remaining = ratelimit.remaining_calls
+        if ratelimit.retry_at is not None:
+            self._resets_at = ratelimit.retry_at.timestamp()
+        else:
+            self._resets_at = now + self.period
+
+    def next(self, at: datetime | None = None) -> PlannedRefresh | None:
+        """Decide the next refresh, and plan the site as refreshed then.
+
+        Args:
+        ----
+            at: The earliest moment of the refresh, now when None.
+
+        Returns:
+        -------
+            The site to refresh and the moment to request its estimate,
+            None when no site has solar activity.
+
+        """
+        if (due := self._peek()) is None:
+            return None
+        moment = self._allowed_at(max(due, (at or datetime.now(UTC)).timestamp()))
+        return self._refresh(moment)
+
+    def plan(self, until: datetime, at: datetime | None = None) -> list[PlannedRefresh]:
+        """Decide all refreshes up to a moment.
+
+        Args:
+        ----
+            until: The end of the plan.
+            at: The start of the plan, now when None.
+
+        Returns:
+        -------
+            The refreshes in order, all planned as done.
+
+        """
+        start = (at or datetime.now(UTC)).timestamp()
+        end = until.timestamp()
+        refreshes: list[PlannedRefresh] = []
+        while (due := self._peek()) is not None:
+            moment = self._allowed_at(max(due, start))
+            if moment > end:
+                break
+            refreshes.append(self._refresh(moment))
+        return refreshes
+
+    def _peek(self) -> float | None:
+        """Return the due moment of the first site, dropping outdated entries."""
+        heap = self._heap
+        sites = self._sites
+        while heap:
+            due, version, key = heap[0]
+            site = sites.get(key)
+            if site is not None and site.version == version:
+                return due
+            heapq.heappop(heap)
+        return None
+
+    def _allowed_at(self, moment: float) -> float:
+        """Return the first moment from which a request is within the limit."""
+        if self._next_call is not None:
+            moment = max(moment, self._next_call)
+        if self._resets_at is not None and (self._remaining or 0) <= 0:
+            moment = max(moment, self._resets_at)
+        return moment
+
+    def _refresh(self, moment: float) -> PlannedRefresh:
+        """Plan the first site as refreshed at a moment."""
+        due, _, key = heapq.heappop(self._heap)
+        site = self._sites[key]
+        if site.refreshed_at is None:
+            # Sites that were never refreshed start at the pace of the others
+            if self._virtual is None:
+                self._virtual = moment
+            site.refreshed_at = self._virtual
+        else:
+            # While the rate limit cannot keep up, count the refresh as done
+            # when it was due, so all sites fall behind at the same pace
+            frontier = self._peek()
+            if frontier is None or frontier > moment:
+                frontier = moment
+            site.refreshed_at = max(due, frontier)
+            self._virtual = max(due, self._virtual or due)
+        if self._resets_at is not None and moment >= self._resets_at:
+            # Once the observed window reset, pacing alone keeps to the limit
+            self._remaining = None
+            self._resets_at = None
+        if self._remaining is not None:
+            self._remaining -= 1
+        self._next_call = moment + self.period / self.call_limit
+        self._push(key, site)
+        return PlannedRefresh(key, datetime.fromtimestamp(moment, UTC))
+
+    def _push(self, key: Hashable, site: _PlannedSite) -> None:
+        """Add the current state of a site to the heap, outdating earlier ones."""
+        site.version = next(self._sequence)
+        if site.activity > 0:
+            heapq.heappush(self._heap, (site.due(), site.version, key))
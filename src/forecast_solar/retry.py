@@ -0,0 +1,192 @@
+"""Retries and circuit breaking for Forecast.Solar requests."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Literal
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from .exceptions import (
+    ForecastSolarCircuitOpenError,
+    ForecastSolarConnectionError,
+    ForecastSolarRatelimitError,
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return if an error is caused by the API or connection being unavailable.
+
+    Args:
+    ----
+        error: The error raised for a request.
+
+    Returns:
+    -------
+        True for connection errors, timeouts and server errors.
+
+    """
+    if isinstance(error, ForecastSolarCircuitOpenError):
+        return False
+    if isinstance(error, ClientResponseError):
+        return error.status >= 500
+    return isinstance(
+        error, ForecastSolarConnectionError | ClientConnectionError | TimeoutError
+    )
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before a failed request is sent again.
+
+    Transient errors are retried with exponential backoff. With jitter, each
+    delay is drawn uniformly between 0 and the backoff, so many clients do
+    not retry in lockstep. Rate limited requests are retried at the moment
+    the rate limit resets, when that is within the deadline.
+
+    Attributes
+    ----------
+        max_attempts: Maximum number of attempts, including the first.
+        backoff: Delay in seconds before the first retry, doubled for
+            every next retry.
+        max_backoff: Maximum delay in seconds between two attempts.
+        jitter: Randomize the delay between 0 and the backoff.
+        deadline: Time in seconds after the first attempt, after which a
+            request is no longer retried. None to retry without deadline.
+
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30
+    jitter: bool = True
+    deadline: float | None = 60
+
+    def __post_init__(self) -> None:
+        """Validate the retry policy.
+
+        Raises
+        ------
+            ValueError: If max_attempts is not positive.
+
+        """
+        if self.max_attempts < 1:
+            msg = "max_attempts must be at least 1"
+            raise ValueError(msg)
+
+    def delay(self, attempt: int, error: BaseException, elapsed: float) -> float | None:
+        """Return the delay before the next attempt.
+
+        Args:
+        ----
+            attempt: Number of the attempt that failed, starting at 1.
+            error: The error raised by the attempt.
+            elapsed: Seconds since the first attempt.
+
+        Returns:
+        -------
+            The delay in seconds, or None if the request should not be
+            retried.
+
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if isinstance(error, ForecastSolarRatelimitError):
+            delay = max(0, (error.reset_at - datetime.now(UTC)).total_seconds())
+        elif is_transient(error):
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            if self.jitter:
+                delay = random.uniform(0, delay)  # noqa: S311
+        else:
+            return None
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
+
+@dataclass
+class CircuitBreaker:
+    """Stop sending requests while the API is unavailable.
+
+    After failure_threshold transient errors in a row the circuit opens, and
+    requests fail right away with ForecastSolarCircuitOpenError. Once
+    recovery_time has passed, a single trial request is let through. The
+    circuit closes when it succeeds, and opens again when it fails.
+
+    Attributes
+    ----------
+        failure_threshold: Number of transient errors in a row that open
+            the circuit.
+        recovery_time: Seconds the circuit stays open before a trial
+            request is sent.
+        failures: Number of transient errors in a row.
+
+    """
+
+    failure_threshold: int = 5
+    recovery_time: float = 30
+    failures: int = 0
+    _opened_at: float | None = field(default=None, repr=False)
+    _trial: bool = field(default=False, repr=False)
+
+    @property
+    def state(self) -> Literal["closed", "open", "half-open"]:
+        """Return the state of the circuit."""
+        if self._opened_at is None:
+            return "closed"
+        if self._trial or time.monotonic() - self._opened_at < self.recovery_time:
+            return "open"
+        return "half-open"
+
+    def check(self) -> None:
+        """Check a request may be sent.
+
+        Raises
+        ------
+            ForecastSolarCircuitOpenError: The circuit is open.
+
+        """
+        state = self.state
+        if state == "open":
+            msg = "The Forecast.Solar API is unavailable, not sending requests"
+            raise ForecastSolarCircuitOpenError(msg)
+        if state == "half-open":
+            self._trial = True
+
+    def record_success(self) -> None:
+        """Record that the API responded, closing the circuit."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record(self, error: BaseException | None = None) -> None:
+        """Record the outcome of a request, whatever it raised.
+
+        Transient errors count as failures, any other error means the API
+        responded. A cancelled request says nothing about the API, so after
+        a cancelled trial request the next request is a new trial.
+
+        Args:
+        ----
+            error: The error raised by the request, None on success.
+
+        """
+        if isinstance(error, asyncio.CancelledError):
+            self._trial = False
+        elif error is not None and is_transient(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def record_failure(self) -> None:
+        """Record a transient error, opening the circuit at the threshold."""
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._trial = False
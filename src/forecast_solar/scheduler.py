@@ -0,0 +1,150 @@
+"""Rate limit aware scheduling of Forecast.Solar requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Ratelimit
+
+
+@dataclass(slots=True)
+class _Bucket:
+    """Token bucket of a single API key."""
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float = field(default_factory=time.monotonic)
+    blocked_until: float = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def refill(self, now: float) -> None:
+        """Add the tokens that became available since the last refill."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Return the seconds until a token can be taken."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class RatelimitScheduler:
+    """Pace requests to stay within the rate limit, per API key.
+
+    Each API key gets a token bucket that refills at call_limit requests per
+    period. Requests wait in a first in, first out queue until a token is
+    available, instead of failing with a rate limit error. A small burst
+    spreads the requests evenly over the period. The call limit and period
+    are updated from the rate limit headers of every response.
+
+    Attributes
+    ----------
+        call_limit: Number of requests allowed per period, until it is
+            known from a response.
+        period: Length of the rate limit period in seconds, until it is
+            known from a response.
+        burst: Number of requests that can be sent without pacing.
+
+    """
+
+    call_limit: int = 12
+    period: int = 3600
+    burst: int = 1
+    _buckets: dict[str | None, _Bucket] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        """Validate the scheduler configuration.
+
+        Raises
+        ------
+            ValueError: If call_limit, period or burst is not positive.
+
+        """
+        if min(self.call_limit, self.period, self.burst) < 1:
+            msg = "call_limit, period and burst must be at least 1"
+            raise ValueError(msg)
+
+    def _bucket(self, api_key: str | None) -> _Bucket:
+        """Return the token bucket of an API key."""
+        if (bucket := self._buckets.get(api_key)) is None:
+            bucket = self._buckets[api_key] = _Bucket(
+                rate=self.call_limit / self.period,
+                capacity=self.burst,
+                tokens=self.burst,
+            )
+        return bucket
+
+    def delay(self, api_key: str | None) -> float:
+        """Return the seconds until a request for an API key may be sent.
+
+        Args:
+        ----
+            api_key: The API key, or None for requests without one.
+
+        Returns:
+        -------
+            The delay in seconds, 0 when a request may be sent right away.
+
+        """
+        return self._bucket(api_key).delay(time.monotonic())
+
+    async def acquire(self, api_key: str | None) -> None:
+        """Wait until a request for an API key may be sent.
+
+        Args:
+        ----
+            api_key: The API key, or None for requests without one.
+
+        """
+        bucket = self._bucket(api_key)
+        async with bucket.lock:
+            # The delay can grow while sleeping, when the rate limit is reached
+            while (delay := bucket.delay(time.monotonic())) > 0:  # noqa: ASYNC110
+                await asyncio.sleep(delay)
+            bucket.tokens -= 1
+
+    def update(self, api_key: str | None, ratelimit: Ratelimit) -> None:
+        """Update the pacing of an API key from a response.
+
+        Args:
+        ----
+            api_key: The API key, or None for requests without one.
+            ratelimit: The rate limit parsed from the response.
+
+        """
+        bucket = self._bucket(api_key)
+        now = time.monotonic()
+        bucket.refill(now)
+        if ratelimit.call_limit > 0 and ratelimit.period > 0:
+            bucket.rate = ratelimit.call_limit / ratelimit.period
+        if ratelimit.remaining_calls == 0:
+            bucket.tokens = min(bucket.tokens, 0)
+            if ratelimit.retry_at is not None:
+                self.block(api_key, ratelimit.retry_at)
+
+    def block(self, api_key: str | None, until: datetime) -> None:
+        """Hold all requests of an API key until a moment.
+
+        Args:
+        ----
+            api_key: The API key, or None for requests without one.
+            until: Moment the rate limit resets.
+
+        """
+        bucket = self._bucket(api_key)
+        now = time.monotonic()
+        delay = (until - datetime.now(UTC)).total_seconds()
+        bucket.blocked_until = max(bucket.blocked_until, now + delay)
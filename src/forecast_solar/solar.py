@@ -0,0 +1,336 @@
+"""Clear sky estimates, computed locally without the Forecast.Solar API."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from math import acos, atan2, cos, degrees, exp, floor, pi, radians, sin, tan
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from .models import Estimate, _Series
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .models import Plane
+
+# Extraterrestrial direct normal irradiance, and its clear sky transmittance
+_SOLAR_CONSTANT = 1353
+_TRANSMITTANCE = 0.7
+
+
+def solar_timezone(longitude: float) -> str:
+    """Return the fixed offset timezone closest to local solar time.
+
+    Days in this timezone run from midnight to midnight in solar time, so
+    no production is split over two days.
+
+    Args:
+    ----
+        longitude: The longitude of the site.
+
+    Returns:
+    -------
+        An Etc/GMT timezone name, for example "Etc/GMT-1" for UTC+1.
+
+    """
+    offset = max(-12, min(14, round(longitude / 15)))
+    if offset == 0:
+        return "Etc/GMT"
+    # The sign of Etc/GMT zones is inverted, Etc/GMT-1 is UTC+1
+    return f"Etc/GMT{-offset:+d}"
+
+
+def parse_horizon(horizon: str) -> tuple[float, ...]:
+    """Parse a horizon profile, as passed to the Forecast.Solar API.
+
+    Args:
+    ----
+        horizon: Comma separated elevations of the horizon in degrees,
+            spread evenly over the compass, starting north and clockwise.
+
+    Returns:
+    -------
+        The elevations of the horizon.
+
+    Raises:
+    ------
+        ValueError: If the profile is not a list of angles.
+
+    """
+    try:
+        elevations = tuple(float(value) for value in horizon.split(","))
+    except ValueError:
+        msg = f"Invalid horizon: {horizon}"
+        raise ValueError(msg) from None
+    if not all(0 <= elevation <= 90 for elevation in elevations):
+        msg = f"Invalid horizon: {horizon}"
+        raise ValueError(msg)
+    return elevations
+
+
+def _sun_orbit(gamma: float) -> tuple[float, float]:
+    """Return the equation of time in minutes and the declination in radians.
+
+    Args:
+    ----
+        gamma: The fractional year in radians.
+
+    """
+    equation_of_time = 229.18 * (
+        0.000075
+        + 0.001868 * cos(gamma)
+        - 0.032077 * sin(gamma)
+        - 0.014615 * cos(2 * gamma)
+        - 0.040849 * sin(2 * gamma)
+    )
+    declination = (
+        0.006918
+        - 0.399912 * cos(gamma)
+        + 0.070257 * sin(gamma)
+        - 0.006758 * cos(2 * gamma)
+        + 0.000907 * sin(2 * gamma)
+        - 0.002697 * cos(3 * gamma)
+        + 0.00148 * sin(3 * gamma)
+    )
+    return equation_of_time, declination
+
+
+def solar_position(
+    timestamp: float, latitude: float, longitude: float
+) -> tuple[float, float]:
+    """Return the position of the sun, following the NOAA approximation.
+
+    Args:
+    ----
+        timestamp: The moment as POSIX seconds.
+        latitude: The latitude of the site in degrees.
+        longitude: The longitude of the site in degrees.
+
+    Returns:
+    -------
+        The elevation of the sun above the horizon and its azimuth, in
+        degrees. The azimuth is 0 in the south and 90 in the west, like the
+        azimuth of a plane.
+
+    """
+    days = timestamp / 86400
+    # Fractional year in radians, on the day of year counted from 1 January
+    whole_days = floor(days)
+    year_start = date.fromordinal(719163 + whole_days).replace(month=1, day=1)
+    day_of_year = whole_days - (year_start.toordinal() - 719163)
+    equation_of_time, declination = _sun_orbit(
+        2 * pi / 365 * (day_of_year + days - whole_days - 0.5)
+    )
+    solar_minutes = (days - whole_days) * 1440 + equation_of_time + 4 * longitude
+    hour_angle = radians(solar_minutes / 4 - 180)
+
+    phi = radians(latitude)
+    cos_zenith = sin(phi) * sin(declination) + cos(phi) * cos(declination) * cos(
+        hour_angle
+    )
+    elevation = 90 - degrees(acos(max(-1.0, min(1.0, cos_zenith))))
+    azimuth = atan2(
+        sin(hour_angle), cos(hour_angle) * sin(phi) - tan(declination) * cos(phi)
+    )
+    return elevation, degrees(azimuth)
+
+
+def sun_times(
+    latitude: float, longitude: float, day: date
+) -> tuple[datetime, datetime]:
+    """Return the sunrise and sunset of a day, following the NOAA approximation.
+
+    The day is a day in local solar time, so far from Greenwich the sunrise
+    may fall on the previous UTC date.
+
+    Args:
+    ----
+        latitude: The latitude of the site in degrees.
+        longitude: The longitude of the site in degrees.
+        day: The day.
+
+    Returns:
+    -------
+        The sunrise and sunset in UTC. During a polar night both are solar
+        noon, during a midnight sun they are the solar midnights around it.
+
+    """
+    equation_of_time, declination = _sun_orbit(
+        2 * pi / 365 * (day.timetuple().tm_yday - 1)
+    )
+    phi = radians(latitude)
+    # Hour angle of the sun at sunrise, with refraction and the solar disc
+    cos_hour_angle = cos(radians(90.833)) / (cos(phi) * cos(declination)) - tan(
+        phi
+    ) * tan(declination)
+    half_day = degrees(acos(max(-1.0, min(1.0, cos_hour_angle)))) * 4
+    noon = datetime.combine(day, time(12), UTC) - timedelta(
+        minutes=4 * longitude + equation_of_time
+    )
+    return noon - timedelta(minutes=half_day), noon + timedelta(minutes=half_day)
+
+
+def clear_sky_irradiance(elevation: float) -> tuple[float, float, float]:
+    """Return the clear sky irradiance for a sun elevation.
+
+    Uses the Haurwitz model for the global horizontal irradiance and the
+    Meinel model, with the Kasten-Young air mass, for the direct normal
+    irradiance. The diffuse irradiance is the remainder.
+
+    Args:
+    ----
+        elevation: The elevation of the sun in degrees.
+
+    Returns:
+    -------
+        The global horizontal, direct normal and diffuse horizontal
+        irradiance in W/m².
+
+    """
+    if elevation <= 0:
+        return 0.0, 0.0, 0.0
+    cos_zenith = sin(radians(elevation))
+    global_horizontal = 1098 * cos_zenith * exp(-0.057 / cos_zenith)
+    air_mass = 1 / (cos_zenith + 0.50572 * (elevation + 6.07995) ** -1.6364)
+    direct_normal = _SOLAR_CONSTANT * _TRANSMITTANCE ** (air_mass**0.678)
+    diffuse = max(0.0, global_horizontal - direct_normal * cos_zenith)
+    return global_horizontal, direct_normal, diffuse
+
+
+@dataclass
+class ClearSkyEstimator:
+    """Computes estimates for a cloudless sky, without the API.
+
+    The estimates are flagged as synthetic. They are an upper bound of the
+    production, useful when the API is unreachable or the rate limit is
+    reached, and to fill caches at startup.
+
+    Attributes
+    ----------
+        latitude: The latitude of the site.
+        longitude: The longitude of the site.
+        planes: The solar planes of the site.
+        horizon: The horizon profile, like the horizon of ForecastSolar.
+        timezone: Timezone of the estimates, the solar timezone of the
+            longitude when None.
+        step: Time between two entries of the estimate.
+        performance_ratio: Fraction of the irradiance on the planes that
+            ends up as AC power.
+        albedo: Fraction of the irradiance reflected by the ground.
+
+    """
+
+    latitude: float
+    longitude: float
+    planes: Sequence[Plane]
+    horizon: str | None = None
+    timezone: str | None = None
+    step: timedelta = timedelta(hours=1)
+    performance_ratio: float = 0.85
+    albedo: float = 0.2
+
+    _horizon: tuple[float, ...] = field(init=False, repr=False)
+    _zone: ZoneInfo = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Parse the horizon profile and timezone.
+
+        Raises
+        ------
+            ValueError: If the horizon profile or step is invalid.
+
+        """
+        self._horizon = parse_horizon(self.horizon) if self.horizon else ()
+        self._zone = ZoneInfo(self.timezone or solar_timezone(self.longitude))
+        if self.step <= timedelta(0):
+            msg = "step must be positive"
+            raise ValueError(msg)
+
+    def power(self, timestamp: float) -> int:
+        """Return the clear sky power of all planes at a moment.
+
+        Args:
+        ----
+            timestamp: The moment as POSIX seconds.
+
+        Returns:
+        -------
+            The power in W.
+
+        """
+        elevation, azimuth = solar_position(timestamp, self.latitude, self.longitude)
+        global_horizontal, direct_normal, diffuse = clear_sky_irradiance(elevation)
+        if not global_horizontal:
+            return 0
+        if self._horizon:
+            sector = int((azimuth + 180) % 360 / 360 * len(self._horizon))
+            if elevation < self._horizon[sector]:
+                direct_normal = 0.0
+
+        zenith = radians(90 - elevation)
+        sun_azimuth = radians(azimuth)
+        power = 0.0
+        for plane in self.planes:
+            tilt = radians(plane.declination)
+            cos_incidence = cos(zenith) * cos(tilt) + sin(zenith) * sin(tilt) * cos(
+                sun_azimuth - radians(plane.azimuth)
+            )
+            irradiance = (
+                direct_normal * max(0.0, cos_incidence)
+                + diffuse * (1 + cos(tilt)) / 2
+                + global_horizontal * self.albedo * (1 - cos(tilt)) / 2
+            )
+            power += irradiance * plane.kwp
+        return round(power * self.performance_ratio)
+
+    def estimate(self, start: date | None = None, days: int = 2) -> Estimate:
+        """Return the clear sky estimate for a number of days.
+
+        Like the API, every day starts with the last entry before sunrise
+        and ends with the first entry after sunset.
+
+        Args:
+        ----
+            start: The first day of the estimate, today when None.
+            days: The number of days.
+
+        Returns:
+        -------
+            A synthetic Estimate object.
+
+        """
+        if start is None:
+            start = datetime.now(self._zone).date()
+        step = self.step.total_seconds()
+        timestamps: list[int] = []
+        values: list[int] = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            midnight = datetime.combine(day, time(), self._zone).timestamp()
+            next_midnight = datetime.combine(
+                day + timedelta(days=1), time(), self._zone
+            ).timestamp()
+            moments = [
+                round(midnight + position * step)
+                for position in range(int((next_midnight - midnight) // step))
+            ]
+            power = [self.power(moment) for moment in moments]
+            producing = [position for position, value in enumerate(power) if value]
+            if not producing:
+                continue
+            first = max(producing[0] - 1, 0)
+            last = min(producing[-1] + 2, len(moments))
+            timestamps.extend(moments[first:last])
+            values.extend(power[first:last])
+
+        estimate = Estimate(
+            watts=_Series(timestamps, [self._zone] * len(timestamps), values),
+            wh_period={},
+            wh_days={},
+            api_rate_limit=0,
+            api_timezone=str(self._zone),
+            synthetic=True,
+        )
+        return estimate.transform()
@@ -0,0 +1,361 @@
+"""Local stand-in for the Forecast.Solar API, for tests and load tests.
+
+The simulator is an aiohttp server that answers the estimate, check and info
+routes used by ForecastSolar. It generates estimates of a configurable size,
+keeps a rate limit per API key and can inject latency and faults:
+
+    async with ForecastSolarSimulator(latency=0.05) as simulator:
+        simulator.inject(Fault(503), Fault(429))
+        async with ForecastSolar(..., base_url=simulator.url) as forecast:
+            estimate = await forecast.estimate()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Self
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+from yarl import URL
+
+if TYPE_CHECKING:
+    from datetime import tzinfo
+
+
+def estimate_payload(  # noqa: PLR0913
+    start: datetime,
+    *,
+    days: int = 2,
+    step: timedelta = timedelta(hours=1),
+    kwp: float = 1,
+    timezone: str = "UTC",
+    ratelimit: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Generate an estimate response with a sine shaped production curve.
+
+    Args:
+    ----
+        start: First timestamp of the series, timezone aware.
+        days: Number of days in the series.
+        step: Time between two timestamps.
+        kwp: Total size of the solar panels in kWp.
+        timezone: Timezone reported in the response.
+        ratelimit: Rate limit reported in the response.
+
+    Returns:
+    -------
+        A dictionary in the format of the estimate endpoint.
+
+    """
+    watts: dict[str, int] = {}
+    wh_period: dict[str, int] = {}
+    wh_total: dict[str, int] = {}
+    wh_days: dict[str, int] = {}
+    hours = step / timedelta(hours=1)
+    total = 0
+    moment = start
+    while moment < start + timedelta(days=days):
+        hour = moment.hour + moment.minute / 60
+        power = round(max(0, math.sin((hour - 6) / 14 * math.pi)) * kwp * 750)
+        energy = round(power * hours)
+        day = moment.date().isoformat()
+        if day not in wh_days:
+            total = 0
+        total += energy
+        watts[moment.isoformat()] = power
+        wh_period[moment.isoformat()] = energy
+        wh_total[moment.isoformat()] = total
+        wh_days[day] = total
+        moment += step
+
+    return {
+        "result": {
+            "watts": watts,
+            "watt_hours_period": wh_period,
+            "watt_hours": wh_total,
+            "watt_hours_day": wh_days,
+        },
+        "message": {
+            "code": 0,
+            "type": "success",
+            "text": "",
+            "info": {"timezone": timezone},
+            "ratelimit": ratelimit or {"period": 3600, "limit": 12},
+        },
+    }
+
+
+@dataclass(frozen=True)
+class Fault:
+    """A response to inject instead of the regular one.
+
+    Attributes
+    ----------
+        status: HTTP status of the response.
+        content_type: Content type of the response.
+        body: Body of the response, an error message matching the status
+            when None.
+
+    """
+
+    status: int
+    content_type: str = "application/json"
+    body: str | None = None
+
+
+@dataclass(slots=True)
+class _Window:
+    """Calls made in the current rate limit period of one zone."""
+
+    started_at: datetime
+    calls: int = 0
+
+
+@dataclass
+class ForecastSolarSimulator:
+    """Offline aiohttp server answering like the Forecast.Solar API.
+
+    Attributes
+    ----------
+        days: Number of days in every estimate.
+        step: Time between two timestamps of an estimate.
+        timezone: Timezone of the generated timestamps.
+        call_limit: Number of estimates allowed per period and zone.
+        period: Length of the rate limit period in seconds.
+        latency: Seconds to wait before every response.
+        error_rate: Fraction of requests answered with a random 502 or 503.
+        seed: Seed of the random faults.
+        requests: Number of requests per route.
+
+    """
+
+    days: int = 2
+    step: timedelta = timedelta(hours=1)
+    timezone: str = "Europe/Amsterdam"
+    call_limit: int = 12
+    period: int = 3600
+    latency: float = 0
+    error_rate: float = 0
+    seed: int | None = None
+    requests: Counter[str] = field(default_factory=Counter)
+
+    _faults: deque[Fault] = field(default_factory=deque, repr=False)
+    _windows: dict[str, _Window] = field(default_factory=dict, repr=False)
+    _random: random.Random = field(init=False, repr=False)
+    _runner: web.AppRunner | None = field(default=None, repr=False)
+    _url: URL | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        """Seed the random faults."""
+        self._random = random.Random(self.seed)  # noqa: S311
+
+    @property
+    def url(self) -> URL:
+        """Return the base URL of the running server."""
+        if self._url is None:
+            msg = "The simulator is not running"
+            raise RuntimeError(msg)
+        return self._url
+
+    def inject(self, *faults: Fault) -> None:
+        """Answer the next requests with faults, in order.
+
+        Args:
+        ----
+            faults: The responses to return instead of the regular ones.
+
+        """
+        self._faults.extend(faults)
+
+    def create_app(self) -> web.Application:
+        """Create the aiohttp application of the simulator.
+
+        Returns
+        -------
+            An application that can be served or used with a test client.
+
+        """
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> URL:
+        """Start serving, on a free port by default.
+
+        Returns
+        -------
+            The base URL of the server.
+
+        """
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self._url = URL.build(scheme="http", host=bound_host, port=bound_port)
+        return self._url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self._url = None
+
+    async def __aenter__(self) -> Self:
+        """Start serving.
+
+        Returns
+        -------
+            The running simulator.
+
+        """
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop serving.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer a request like the Forecast.Solar API."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        parts = request.match_info["path"].strip("/").split("/")
+        api_key = None
+        if parts[0] not in ("estimate", "check", "info"):
+            api_key, parts = parts[0], parts[1:]
+        route = parts[0] if parts else ""
+        self.requests[route] += 1
+
+        if self._faults:
+            return self._fault_response(self._faults.popleft())
+        if self._random.random() < self.error_rate:
+            return self._fault_response(Fault(self._random.choice((502, 503))))
+
+        if route == "info" and api_key is not None:
+            return _json_response({"result": {"account": "Personal"}})
+        try:
+            coordinates = [float(part) for part in parts[1:]]
+        except ValueError:
+            coordinates = []
+        planes = coordinates[2:]
+        if route not in ("estimate", "check") or not planes or len(planes) % 3:
+            return _error_response(404, "Not found")
+        if route == "check":
+            return _json_response(
+                {"result": {"latitude": coordinates[0], "longitude": coordinates[1]}}
+            )
+        return self._estimate(request, api_key, sum(planes[2::3]))
+
+    def _estimate(
+        self, request: web.Request, api_key: str | None, kwp: float
+    ) -> web.Response:
+        """Answer an estimate request, within the rate limit of its zone."""
+        zone = f"API key {api_key}" if api_key else request.remote or "unknown"
+        now = datetime.now(UTC)
+        window = self._windows.get(zone)
+        if window is None or now - window.started_at >= timedelta(seconds=self.period):
+            window = self._windows[zone] = _Window(now)
+
+        retry_at = window.started_at + timedelta(seconds=self.period)
+        ratelimit = {"zone": zone, "period": self.period, "limit": self.call_limit}
+        headers = {
+            "X-Ratelimit-Limit": str(self.call_limit),
+            "X-Ratelimit-Period": str(self.period),
+        }
+        if window.calls >= self.call_limit:
+            headers["X-Ratelimit-Retry-At"] = retry_at.isoformat()
+            ratelimit["retry-at"] = retry_at.isoformat()
+            return _error_response(
+                429, "Rate limit for API calls reached.", ratelimit, headers
+            )
+
+        window.calls += 1
+        remaining = self.call_limit - window.calls
+        headers["X-Ratelimit-Remaining"] = str(remaining)
+        zone_info: tzinfo = (
+            UTC if request.query.get("time") == "utc" else ZoneInfo(self.timezone)
+        )
+        start = now.astimezone(zone_info).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        payload = estimate_payload(
+            start,
+            days=self.days,
+            step=self.step,
+            kwp=kwp,
+            timezone=self.timezone,
+            ratelimit={**ratelimit, "remaining": remaining},
+        )
+        return _json_response(payload, headers)
+
+    def _fault_response(self, fault: Fault) -> web.Response:
+        """Return the response of an injected fault."""
+        if fault.body is not None:
+            body = fault.body
+        elif fault.status == 429:
+            retry_at = datetime.now(UTC).isoformat()
+            body = json.dumps(
+                {
+                    "result": None,
+                    "message": {
+                        "code": 429,
+                        "type": "error",
+                        "text": "Rate limit for API calls reached.",
+                        "ratelimit": {"retry-at": retry_at},
+                    },
+                }
+            )
+        else:
+            body = json.dumps(
+                {
+                    "result": None,
+                    "message": {"code": fault.status, "type": "error", "text": "Fault"},
+                }
+            )
+        headers = {
+            "Content-Type": fault.content_type,
+            "X-Ratelimit-Limit": str(self.call_limit),
+            "X-Ratelimit-Period": str(self.period),
+        }
+        return web.Response(status=fault.status, text=body, headers=headers)
+
+
+def _json_response(
+    data: dict[str, Any], headers: dict[str, str] | None = None, status: int = 200
+) -> web.Response:
+    """Return a JSON response."""
+    return web.Response(
+        status=status,
+        text=json.dumps(data),
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def _error_response(
+    status: int,
+    text: str,
+    ratelimit: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> web.Response:
+    """Return an error response like the Forecast.Solar API."""
+    message: dict[str, Any] = {"code": status, "type": "error", "text": text}
+    if ratelimit is not None:
+        message["ratelimit"] = ratelimit
+    return _json_response({"result": None, "message": message}, headers, status)
@@ -0,0 +1,66 @@
+"""Transport configuration for Forecast.Solar requests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+
+@dataclass(frozen=True)
+class Transport:
+    """Timeouts and connection pool used for Forecast.Solar requests.
+
+    The timeouts are applied to every request, also on a session that is
+    passed in. The connection pool settings only apply to a session that is
+    created by the client.
+
+    Attributes
+    ----------
+        total_timeout: Seconds a request may take in total, or None.
+        connect_timeout: Seconds to wait for a connection from the pool,
+            including establishing a new one, or None.
+        read_timeout: Seconds to wait for new data from the API, or None.
+        limit: Maximum number of open connections, 0 for no limit.
+        limit_per_host: Maximum number of open connections to one host,
+            0 for no limit.
+        keepalive_timeout: Seconds an idle connection is kept open.
+        dns_cache_ttl: Seconds a DNS lookup is cached, or None to cache
+            it forever.
+        verify_ssl: Verify the SSL certificate of the API.
+
+    """
+
+    total_timeout: float | None = 30
+    connect_timeout: float | None = 10
+    read_timeout: float | None = 20
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15
+    dns_cache_ttl: int | None = 10
+    verify_ssl: bool = False
+
+    @property
+    def timeout(self) -> ClientTimeout:
+        """Return the timeouts of a request."""
+        return ClientTimeout(
+            total=self.total_timeout,
+            connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+    def create_session(self) -> ClientSession:
+        """Create a session with a connection pool following this config.
+
+        Returns
+        -------
+            A new ClientSession.
+
+        """
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        return ClientSession(connector=connector, timeout=self.timeout)
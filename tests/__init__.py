@@ -2,8 +2,46 @@
 
 from pathlib import Path
 
+from aresponses import ResponsesMockServer
+
+ESTIMATE_PATH = "/estimate/52.16/4.47/20/10/2.16"
+
 
 def load_fixtures(filename: str) -> str:
     """Load a fixture."""
     path = Path(__file__).parent / "fixtures" / filename
     return path.read_text()
+
+
+def add_estimate(  # noqa: PLR0913
+    aresponses: ResponsesMockServer,
+    path: str = ESTIMATE_PATH,
+    *,
+    status: int = 200,
+    fixture: str | None = None,
+    remaining: int = 10,
+    repeat: int = 1,
+) -> None:
+    """Add an estimate response with rate limit headers.
+
+    The fixture is the rate limit error for status 429, and the estimate
+    for any other status, unless it is given.
+    """
+    if fixture is None:
+        fixture = "ratelimit.json" if status == 429 else "forecast.json"
+    aresponses.add(
+        "api.forecast.solar",
+        path,
+        "GET",
+        aresponses.Response(
+            status=status,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+                "X-Ratelimit-Remaining": str(remaining),
+            },
+            text=load_fixtures(fixture),
+        ),
+        repeat=repeat,
+    )
@@ -0,0 +1,246 @@
+"""Test the estimate cache."""
+
+# pylint: disable=protected-access
+
+import asyncio
+import json
+import threading
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from aresponses import ResponsesMockServer
+from freezegun.api import FrozenDateTimeFactory
+
+from forecast_solar import (
+    Estimate,
+    EstimateCache,
+    ForecastSolar,
+    ForecastSolarRatelimitError,
+    PersistentEstimateCache,
+)
+
+from . import ESTIMATE_PATH, add_estimate, load_fixtures
+
+
+def add_ratelimit(aresponses: ResponsesMockServer) -> None:
+    """Add a rate limited estimate response."""
+    aresponses.add(
+        "api.forecast.solar",
+        ESTIMATE_PATH,
+        "GET",
+        aresponses.Response(
+            status=429,
+            headers={"Content-Type": "application/json"},
+            text=load_fixtures("ratelimit.json"),
+        ),
+    )
+
+
+@pytest.mark.freeze_time("2024-04-27T02:00:00+02:00")
+async def test_cached_estimate(
+    aresponses: ResponsesMockServer,
+    freezer: FrozenDateTimeFactory,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test estimates are served from the cache until they expire."""
+    add_estimate(aresponses, repeat=2)
+    forecast_client.cache = EstimateCache(ttl=timedelta(minutes=10))
+
+    first = await forecast_client.estimate()
+    assert await forecast_client.estimate() is first
+    assert (forecast_client.cache.hits, forecast_client.cache.misses) == (1, 1)
+
+    freezer.tick(timedelta(minutes=10))
+    second = await forecast_client.estimate()
+    assert second is not first
+    assert second == first
+    assert (forecast_client.cache.hits, forecast_client.cache.misses) == (1, 2)
+    assert len(forecast_client.cache) == 1
+
+    aresponses.assert_all_requests_matched()
+
+
+@pytest.mark.freeze_time("2024-04-27T02:00:00+02:00")
+async def test_cached_estimate_served_when_rate_limited(
+    aresponses: ResponsesMockServer,
+    freezer: FrozenDateTimeFactory,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test expired estimates are served while the rate limit is reached."""
+    add_estimate(aresponses)
+    add_ratelimit(aresponses)
+    add_estimate(aresponses)
+    forecast_client.cache = EstimateCache(ttl=timedelta(minutes=10))
+
+    estimate = await forecast_client.estimate()
+    freezer.tick(timedelta(minutes=15))
+
+    # The API answers with a rate limit error, reset at 02:48:53
+    assert await forecast_client.estimate() is estimate
+    # Until the reset, the API is not called at all
+    assert await forecast_client.estimate() is estimate
+    assert forecast_client.cache.stale_hits == 2
+
+    freezer.tick(timedelta(minutes=34))
+    assert await forecast_client.estimate() is not estimate
+
+    aresponses.assert_all_requests_matched()
+
+
+@pytest.mark.freeze_time("2024-04-27T02:00:00+02:00")
+async def test_cached_estimate_served_when_quota_used(
+    aresponses: ResponsesMockServer,
+    freezer: FrozenDateTimeFactory,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test the API is not called when the last call used the quota."""
+    add_estimate(aresponses, remaining=0)
+    forecast_client.cache = EstimateCache(ttl=timedelta(minutes=10))
+
+    estimate = await forecast_client.estimate()
+    freezer.tick(timedelta(minutes=15))
+
+    assert await forecast_client.estimate() is estimate
+    assert forecast_client.cache.stale_hits == 1
+    aresponses.assert_all_requests_matched()
+
+
+async def test_rate_limited_without_cached_estimate(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test the rate limit error is raised when nothing is cached."""
+    add_ratelimit(aresponses)
+    forecast_client.cache = EstimateCache()
+
+    with pytest.raises(ForecastSolarRatelimitError):
+        await forecast_client.estimate()
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test the cache is bounded in size."""
+    estimate = Estimate(
+        watts={}, wh_period={}, wh_days={}, api_rate_limit=10, api_timezone="UTC"
+    )
+    cache = EstimateCache(max_size=2)
+    first = ("first", ())
+    second = ("second", ())
+    third = ("third", ())
+
+    cache.set(first, estimate)
+    cache.set(second, estimate)
+    assert cache.get(first) is estimate
+    cache.set(third, estimate)
+
+    assert cache.get(second) is None
+    assert cache.get_stale(second) is None
+    assert cache.get(first) is estimate
+    assert cache.get(third) is estimate
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.freeze_time("2024-04-27T02:00:00+02:00")
+async def test_stale_estimate_refreshed_in_background(
+    aresponses: ResponsesMockServer,
+    freezer: FrozenDateTimeFactory,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test expired estimates are served while they are refreshed."""
+    add_estimate(aresponses, repeat=2)
+    cache = EstimateCache(ttl=timedelta(minutes=10), serve_stale=True)
+    forecast_client.cache = cache
+
+    estimate = await forecast_client.estimate()
+    freezer.tick(timedelta(minutes=15))
+
+    assert await forecast_client.estimate() is estimate
+    assert await forecast_client.estimate() is estimate
+    assert cache.stale_hits == 2
+
+    # Both stale estimates share a single refresh
+    await asyncio.gather(*forecast_client._refreshing.values())
+    refreshed = await forecast_client.estimate()
+    assert refreshed is not estimate
+    assert refreshed == estimate
+    aresponses.assert_all_requests_matched()
+
+
+async def test_persistent_cache(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+    tmp_path: Path,
+) -> None:
+    """Test estimates are kept in the database across restarts."""
+    add_estimate(aresponses)
+    path = tmp_path / "estimates.db"
+    cache = PersistentEstimateCache(path=path)
+    forecast_client.cache = cache
+    estimate = await forecast_client.estimate()
+    cache.close()
+
+    # A new cache loads the estimate from the database on first use
+    restarted = PersistentEstimateCache(path=path)
+    forecast_client.cache = restarted
+    assert len(restarted) == 0
+    assert await forecast_client.estimate() == estimate
+    assert len(restarted) == 1
+    assert restarted.hits == 1
+
+    # Once cleared, the estimate is requested again
+    restarted.clear()
+    restarted.close()
+    add_estimate(aresponses)
+    forecast_client.cache = PersistentEstimateCache(path=path)
+    assert await forecast_client.estimate() == estimate
+    assert forecast_client.cache.misses == 1
+    aresponses.assert_all_requests_matched()
+
+
+async def test_persistent_cache_off_loop(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test the client reads and writes the database in a worker thread."""
+    add_estimate(aresponses)
+    cache = PersistentEstimateCache(path=tmp_path / "estimates.db")
+    threads: list[int] = []
+    for name in ("_read", "_write"):
+        method = getattr(cache, name)
+
+        def record(*args: object, method: Callable[..., object] = method) -> object:
+            threads.append(threading.get_ident())
+            return method(*args)
+
+        monkeypatch.setattr(cache, name, record)
+    forecast_client.cache = cache
+
+    await forecast_client.estimate()
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+    cache.close()
+    aresponses.assert_all_requests_matched()
+
+
+def test_persistent_cache_pruned(tmp_path: Path) -> None:
+    """Test the database keeps only the max_size newest estimates."""
+    estimate = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    cache = PersistentEstimateCache(path=tmp_path / "estimates.db", max_size=2)
+    keys = [(f"estimate/{site}", ()) for site in range(3)]
+    for key in keys:
+        cache.set(key, estimate)
+
+    rows = cache.connection.execute("SELECT COUNT(*) FROM estimates").fetchone()
+    assert rows == (2,)
+    cache.close()
+
+    restarted = PersistentEstimateCache(path=tmp_path / "estimates.db")
+    assert restarted.get_stale(keys[0]) is None
+    assert restarted.get_stale(keys[2]) == estimate
+    restarted.close()
@@ -0,0 +1,116 @@
+"""Test skipping estimate refreshes at night."""
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from aresponses import ResponsesMockServer
+from freezegun.api import FrozenDateTimeFactory
+
+from forecast_solar import DaylightRefresher, ForecastSolar, daylight
+from forecast_solar.solar import sun_times
+
+from . import load_fixtures
+
+
+@pytest.mark.parametrize(
+    ("latitude", "longitude", "day", "sunrise", "sunset"),
+    [
+        (52.16, 4.47, date(2024, 6, 21), "2024-06-21T03:20", "2024-06-21T20:06"),
+        (-33.87, 151.21, date(2024, 6, 21), "2024-06-20T20:59", "2024-06-21T06:53"),
+        # Polar night and midnight sun
+        (78.22, 15.65, date(2024, 12, 21), "2024-12-21T10:55", "2024-12-21T10:55"),
+        (78.22, 15.65, date(2024, 6, 21), "2024-06-20T22:58", "2024-06-21T22:58"),
+    ],
+)
+def test_sun_times(
+    latitude: float, longitude: float, day: date, sunrise: str, sunset: str
+) -> None:
+    """Test sunrise and sunset of a day in local solar time."""
+    result = sun_times(latitude, longitude, day)
+
+    assert [moment.strftime("%Y-%m-%dT%H:%M") for moment in result] == [
+        sunrise,
+        sunset,
+    ]
+
+
+def test_daylight_window(forecast_client: ForecastSolar) -> None:
+    """Test the moments refreshes are allowed."""
+    refresher = DaylightRefresher(forecast_client, after_sunset=timedelta(minutes=30))
+    # Sunrise at 03:20 and sunset at 20:06 UTC
+    morning = datetime(2024, 6, 21, 2, 30, tzinfo=UTC)
+    evening = datetime(2024, 6, 21, 20, 30, tzinfo=UTC)
+    night = datetime(2024, 6, 21, 21, 0, tzinfo=UTC)
+
+    assert refresher.is_night(datetime(2024, 6, 21, 2, 0, tzinfo=UTC))
+    assert not refresher.is_night(morning)
+    assert not refresher.is_night(evening)
+    assert refresher.is_night(night)
+
+    assert refresher.next_refresh(morning) == morning
+    assert refresher.next_refresh(night).strftime("%Y-%m-%dT%H:%M") == (
+        "2024-06-22T02:20"
+    )
+    assert (
+        refresher.next_refresh(datetime(2024, 6, 21, 1, 0, tzinfo=UTC)).strftime(
+            "%H:%M"
+        )
+        == "02:20"
+    )
+
+
+def test_daylight_window_memoized(
+    forecast_client: ForecastSolar, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test sunrise and sunset are computed once per day by each refresher."""
+    days: list[date] = []
+
+    def counting(latitude: float, longitude: float, day: date) -> object:
+        days.append(day)
+        return sun_times(latitude, longitude, day)
+
+    monkeypatch.setattr(daylight, "sun_times", counting)
+    refresher = DaylightRefresher(forecast_client)
+    start = datetime(2024, 6, 21, tzinfo=UTC)
+    for minutes in range(0, 4 * 24 * 60, 15):
+        refresher.is_night(start + timedelta(minutes=minutes))
+        refresher.next_refresh(start + timedelta(minutes=minutes))
+
+    assert days == [date(2024, 6, day) for day in range(21, 26)]
+    # Days before yesterday are dropped
+    assert sorted(refresher._sun_times) == [date(2024, 6, 24), date(2024, 6, 25)]
+
+
+@pytest.mark.freeze_time("2024-06-21T12:00:00+00:00")
+async def test_daylight_refresher(
+    aresponses: ResponsesMockServer,
+    freezer: FrozenDateTimeFactory,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test the last estimate is served at night."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+                "X-Ratelimit-Remaining": "10",
+            },
+            text=load_fixtures("forecast.json"),
+        ),
+        repeat=2,
+    )
+    refresher = DaylightRefresher(forecast_client)
+
+    day = await refresher.estimate()
+    freezer.move_to("2024-06-21T23:00:00+00:00")
+    assert await refresher.estimate() is day
+    assert refresher.skipped == 1
+
+    freezer.move_to("2024-06-22T03:00:00+00:00")
+    assert await refresher.estimate() is not day
+    aresponses.assert_all_requests_matched()
@@ -0,0 +1,211 @@
+"""Test the fleet client."""
+
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from aiohttp import ClientSession, web
+from aresponses import ResponsesMockServer
+
+from forecast_solar import (
+    Estimate,
+    EstimateCache,
+    ForecastSolarConfigError,
+    ForecastSolarFleet,
+    ForecastSolarRatelimitError,
+    MetricsAggregator,
+    Site,
+)
+
+from . import add_estimate, load_fixtures
+
+SITES = [
+    Site(latitude=52.16, longitude=4.47, declination=20, azimuth=10, kwp=2.16),
+    Site(latitude=52.16, longitude=4.47, declination=30, azimuth=-90, kwp=1.5),
+    Site(latitude=51.0, longitude=5.0, declination=45, azimuth=0, kwp=4.0),
+]
+
+
+async def test_fleet_estimate(aresponses: ResponsesMockServer) -> None:
+    """Test a failing site does not abort the other sites."""
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.16")
+    add_estimate(aresponses, "/estimate/52.16/4.47/30/-90/1.5", status=422)
+    add_estimate(aresponses, "/estimate/51.0/5.0/45/0/4.0")
+
+    async with ForecastSolarFleet(SITES, max_concurrency=2) as fleet:
+        results = await fleet.estimate()
+        assert fleet.session is not None
+
+    assert fleet.session.closed
+    assert [result.site for result in results] == SITES
+    assert isinstance(results[0].estimate, Estimate)
+    assert results[0].error is None
+    assert results[1].estimate is None
+    assert isinstance(results[1].error, ForecastSolarConfigError)
+    assert isinstance(results[2].estimate, Estimate)
+    assert fleet.ratelimit is not None
+    assert fleet.ratelimit.remaining_calls == 10
+    aresponses.assert_all_requests_matched()
+
+
+async def test_fleet_malformed_response(aresponses: ResponsesMockServer) -> None:
+    """Test a malformed response of one site does not abort the batch."""
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.16")
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/30/-90/1.5",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+                "X-Ratelimit-Remaining": "9",
+            },
+            text="{not json",
+        ),
+    )
+    add_estimate(aresponses, "/estimate/51.0/5.0/45/0/4.0")
+
+    async with ForecastSolarFleet(SITES) as fleet:
+        results = await fleet.estimate()
+
+    assert isinstance(results[0].estimate, Estimate)
+    assert results[1].estimate is None
+    assert isinstance(results[1].error, json.JSONDecodeError)
+    assert isinstance(results[2].estimate, Estimate)
+    aresponses.assert_all_requests_matched()
+
+
+async def test_fleet_ratelimit(aresponses: ResponsesMockServer) -> None:
+    """Test sites after a rate limited request are not requested."""
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.16", status=429)
+
+    async with ClientSession() as session:
+        async with ForecastSolarFleet(
+            SITES, max_concurrency=1, session=session
+        ) as fleet:
+            results = await fleet.estimate()
+        assert not session.closed
+
+    errors = [result.error for result in results]
+    assert isinstance(errors[0], ForecastSolarRatelimitError)
+    assert errors[0] is errors[1] is errors[2]
+    aresponses.assert_all_requests_matched()
+
+
+async def test_fleet_ratelimit_cache(aresponses: ResponsesMockServer) -> None:
+    """Test cached sites are still served once the rate limit is reached."""
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.16")
+    add_estimate(aresponses, "/estimate/52.16/4.47/30/-90/1.5")
+    add_estimate(aresponses, "/estimate/51.0/5.0/45/0/4.0", status=429)
+    cache = EstimateCache()
+
+    async with ForecastSolarFleet(SITES[:2], cache=cache) as fleet:
+        await fleet.estimate()
+    async with ForecastSolarFleet(
+        [SITES[2], *SITES[:2]], max_concurrency=1, cache=cache
+    ) as fleet:
+        limited, first, second = await fleet.estimate()
+
+    assert isinstance(limited.error, ForecastSolarRatelimitError)
+    assert isinstance(first.estimate, Estimate)
+    assert isinstance(second.estimate, Estimate)
+    assert cache.hits == 2
+    aresponses.assert_all_requests_matched()
+
+
+async def test_fleet_stale_refresh(aresponses: ResponsesMockServer) -> None:
+    """Test stale estimates are refreshed once, and stopped on close."""
+
+    async def slow_response(_: web.BaseRequest) -> web.Response:
+        await asyncio.sleep(10)
+        return aresponses.Response(status=200)  # pragma: no cover
+
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.16")
+    aresponses.add(
+        "api.forecast.solar", "/estimate/52.16/4.47/20/10/2.16", "GET", slow_response
+    )
+    cache = EstimateCache(ttl=timedelta(0), serve_stale=True)
+
+    async with ForecastSolarFleet(SITES[:1], cache=cache) as fleet:
+        [result] = await fleet.estimate()
+        await fleet.estimate()
+        [task] = fleet._refreshing.values()
+        assert (await fleet.estimate())[0].estimate is result.estimate
+        assert list(fleet._refreshing.values()) == [task]
+
+    assert task.cancelled()
+    assert cache.stale_hits == 2
+
+
+async def test_fleet_concurrency(aresponses: ResponsesMockServer) -> None:
+    """Test no more than max_concurrency requests are in flight."""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(_request: web.Request) -> web.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+            },
+            text=load_fixtures("forecast.json"),
+        )
+
+    sites = [
+        Site(latitude=50, longitude=4, declination=20, azimuth=0, kwp=kwp)
+        for kwp in range(1, 9)
+    ]
+    aresponses.add("api.forecast.solar", response=handler, repeat=len(sites))
+
+    async with ForecastSolarFleet(sites, max_concurrency=3) as fleet:
+        results = await fleet.estimate()
+
+    assert all(result.estimate is not None for result in results)
+    assert max_in_flight == 3
+
+
+async def test_fleet_invalid_concurrency() -> None:
+    """Test max_concurrency must be positive."""
+    with pytest.raises(ValueError, match="max_concurrency"):
+        ForecastSolarFleet(SITES, max_concurrency=0)
+
+
+async def test_fleet_shared_estimate(aresponses: ResponsesMockServer) -> None:
+    """Test sites that only differ in size share a 1 kWp estimate."""
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/1")
+    add_estimate(aresponses, "/estimate/52.16/4.47/20/10/2.0")
+    sites = [
+        Site(latitude=52.1612, longitude=4.4711, declination=20, azimuth=10, kwp=2),
+        Site(latitude=52.1588, longitude=4.4703, declination=20, azimuth=10, kwp=5),
+        Site(latitude=52.16, longitude=4.47, declination=20, azimuth=10, kwp=2.0),
+    ]
+    sites[2].inverter = 1.5
+
+    aggregator = MetricsAggregator()
+
+    async with ForecastSolarFleet(
+        sites,
+        max_concurrency=1,
+        share_location_decimals=2,
+        cache=EstimateCache(),
+        observer=aggregator,
+    ) as fleet:
+        first, second, clipped = await fleet.estimate()
+
+    base = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    assert first.estimate == base.scaled(2)
+    assert second.estimate == base.scaled(5)
+    assert clipped.estimate == base
+    assert aggregator.stats["estimate/{latitude}/{longitude}/{planes}"].requests == 2
+    aresponses.assert_all_requests_matched()
@@ -2,12 +2,20 @@
 
 # pylint: disable=protected-access
 
+import asyncio
+import json
+from typing import Any
+
 import pytest
 from aresponses import ResponsesMockServer
 
 from forecast_solar import (
+    Estimate,
     ForecastSolar,
+    ForecastSolarConnectionError,
     ForecastSolarError,
+    ForecastSolarRequestError,
+    MetricsAggregator,
 )
 
 from . import load_fixtures
@@ -85,3 +93,182 @@ async def test_content_type(
     )
     with pytest.raises(ForecastSolarError):
         assert await forecast_client._request("test")
+
+
+@pytest.mark.parametrize(
+    ("status", "exception"),
+    [(200, None), (400, ForecastSolarRequestError)],
+)
+async def test_custom_json_loads(
+    aresponses: ResponsesMockServer,
+    status: int,
+    exception: type[ForecastSolarError] | None,
+) -> None:
+    """Test the body is decoded once with the configured JSON decoder."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(
+            status=status,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "10",
+                "X-Ratelimit-Period": "1",
+            },
+            text=load_fixtures("forecast.json"),
+        ),
+    )
+    decoded: list[bytes] = []
+
+    def json_loads(body: bytes) -> Any:
+        decoded.append(body)
+        return json.loads(body)
+
+    async with ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        json_loads=json_loads,
+    ) as client:
+        if exception is None:
+            assert await client._request("test") == json.loads(
+                load_fixtures("forecast.json")
+            )
+        else:
+            with pytest.raises(exception):
+                await client._request("test")
+
+    assert decoded == [load_fixtures("forecast.json").encode()]
+
+
+async def test_concurrent_requests_are_coalesced(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test identical requests in flight on one session are sent once."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+                "X-Ratelimit-Remaining": "11",
+            },
+            text=load_fixtures("forecast.json"),
+        ),
+    )
+    other_client = ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        horizon="0,0,0,10,10,20,20,30,30",
+        session=forecast_client.session,
+    )
+
+    first, second, third = await asyncio.gather(
+        forecast_client.estimate(),
+        forecast_client.estimate(),
+        other_client.estimate(),
+    )
+
+    assert first == second == third
+    assert forecast_client.ratelimit == other_client.ratelimit
+    assert other_client.ratelimit is not None
+    assert other_client.ratelimit.remaining_calls == 11
+    aresponses.assert_all_requests_matched()
+
+
+async def test_concurrent_requests_share_exception(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test every coalesced caller receives the same exception."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(status=502, text="Bad Gateway"),
+    )
+
+    errors = await asyncio.gather(
+        forecast_client._request("test"),
+        forecast_client._request("test"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(errors[0], ForecastSolarConnectionError)
+    assert errors[0] is errors[1]
+
+
+async def test_cancelled_caller_does_not_cancel_shared_request(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test cancelling one caller leaves the shared request running."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"result": true}',
+        ),
+    )
+
+    cancelled = asyncio.create_task(forecast_client._request("test", rate_limit=False))
+    waiting = asyncio.create_task(forecast_client._request("test", rate_limit=False))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await waiting == {"result": True}
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_streamed_estimate(aresponses: ResponsesMockServer) -> None:
+    """Test a streamed response is decoded like a buffered one."""
+    for _ in range(2):
+        aresponses.add(
+            "api.forecast.solar",
+            "/test",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Ratelimit-Limit": "10",
+                    "X-Ratelimit-Period": "1",
+                    "X-Ratelimit-Remaining": "3",
+                },
+                text=load_fixtures("forecast_personal.json"),
+            ),
+        )
+    aggregator = MetricsAggregator()
+
+    async with ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        observer=aggregator,
+    ) as client:
+        buffered = await client._request("test", build=Estimate.from_dict)
+        client.stream = True
+        streamed = await client._request("test", build=Estimate.from_dict)
+
+    assert streamed == buffered
+    stats = aggregator.stats["test"]
+    assert stats.bytes_received == 2 * len(load_fixtures("forecast_personal.json"))
+    assert stats.ratelimit_remaining == 3
+    assert stats.decode_time.count == 2
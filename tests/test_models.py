@@ -1,12 +1,23 @@
 """Test the models."""
 
-from datetime import date, datetime
+import json
+from datetime import UTC, date, datetime, timedelta
 
 import pytest
 from aresponses import ResponsesMockServer
 from syrupy.assertion import SnapshotAssertion
 
-from forecast_solar import AccountType, Estimate, ForecastSolar, Plane
+from forecast_solar import (
+    AccountType,
+    DaySummary,
+    Estimate,
+    EstimateSnapshot,
+    ForecastSolar,
+    Plane,
+    models,
+)
+from forecast_solar._stream import StreamDecoder
+from forecast_solar.models import SampleMethod
 
 from . import load_fixtures
 
@@ -301,3 +312,500 @@ def test_peak_production_time_filters_peak_by_date() -> None:
     assert forecast.peak_production_time(date(2024, 4, 26)) == datetime.fromisoformat(
         "2024-04-26T00:00:00+02:00"
     )
+
+
+def test_time_index_lookups_match_series_boundaries() -> None:
+    """Test bisection and prefix-sum lookups keep the linear scan semantics."""
+    forecast = Estimate(
+        watts={
+            datetime.fromisoformat("2024-04-26T08:00:00+02:00"): 100,
+            datetime.fromisoformat("2024-04-26T07:00:00+02:00"): 50,
+            datetime.fromisoformat("2024-04-26T09:00:00+02:00"): 0,
+        },
+        wh_period={
+            datetime.fromisoformat("2024-04-26T07:00:00+02:00"): 25,
+            datetime.fromisoformat("2024-04-26T08:00:00+02:00"): 75,
+            datetime.fromisoformat("2024-04-26T09:00:00+02:00"): 50,
+        },
+        wh_days={},
+        api_rate_limit=10,
+        api_timezone="Europe/Amsterdam",
+    )
+
+    at = datetime.fromisoformat
+    assert forecast.power_production_at_time(at("2024-04-26T06:59:59+02:00")) == 0
+    assert forecast.power_production_at_time(at("2024-04-26T07:00:00+02:00")) == 50
+    assert forecast.power_production_at_time(at("2024-04-26T08:30:00+02:00")) == 100
+    assert forecast.power_production_at_time(at("2024-04-26T09:00:00+02:00")) == 0
+    assert forecast.power_production_at_time(at("2024-04-26T06:30:00+00:00")) == 100
+
+    assert (
+        forecast.energy_between(
+            at("2024-04-26T07:00:00+02:00"), at("2024-04-26T09:00:00+02:00")
+        )
+        == 100
+    )
+    assert (
+        forecast.energy_between(
+            at("2024-04-26T07:00:01+02:00"), at("2024-04-26T09:00:01+02:00")
+        )
+        == 125
+    )
+    assert (
+        forecast.energy_between(
+            at("2024-04-26T09:00:00+02:00"), at("2024-04-26T07:00:00+02:00")
+        )
+        == 0
+    )
+
+
+def test_estimate_series_views() -> None:
+    """Test the dict-style attributes are read-only views on the series."""
+    data = json.loads(load_fixtures("forecast_personal.json"))
+    forecast = Estimate.from_dict(data)
+    watts = {
+        datetime.fromisoformat(timestamp): value
+        for timestamp, value in data["result"]["watts"].items()
+    }
+
+    assert forecast.watts == watts
+    assert len(forecast.watts) == len(watts)
+    assert list(forecast.watts.values()) == list(watts.values())
+    assert forecast.watts[datetime.fromisoformat("2024-04-27T13:30:00+02:00")] == 639
+    assert forecast.watts[datetime.fromisoformat("2024-04-27T11:30:00+00:00")] == 639
+    assert datetime.fromisoformat("2024-04-27T13:30:01+02:00") not in forecast.watts
+    assert datetime(2024, 4, 27, 13, 30) not in forecast.watts  # noqa: DTZ001
+    assert forecast.wh_days[datetime(2024, 4, 28)] == 7507  # noqa: DTZ001
+    assert repr(forecast.wh_days) == repr(
+        {
+            datetime.fromisoformat(timestamp): value
+            for timestamp, value in data["result"]["watt_hours_day"].items()
+        }
+    )
+
+    with pytest.raises(KeyError):
+        forecast.wh_days[datetime.fromisoformat("2024-04-28T00:00:00+00:00")]
+
+    assert forecast == Estimate(
+        watts=watts,
+        wh_period=forecast.wh_period,
+        wh_days=forecast.wh_days,
+        api_rate_limit=60,
+        api_timezone="Europe/Amsterdam",
+    )
+    assert forecast != Estimate(
+        watts={},
+        wh_period=forecast.wh_period,
+        wh_days=forecast.wh_days,
+        api_rate_limit=60,
+        api_timezone="Europe/Amsterdam",
+    )
+    assert forecast != data
+
+
+def test_estimate_days() -> None:
+    """Test the per-day summaries of an estimate."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+
+    assert list(forecast.days()) == [
+        DaySummary(
+            day=date(2024, 4, 26),
+            energy_production=6660,
+            peak_time=datetime.fromisoformat("2024-04-26T11:00:00+02:00"),
+            peak_power=869,
+        ),
+        DaySummary(
+            day=date(2024, 4, 27),
+            energy_production=5338,
+            peak_time=datetime.fromisoformat("2024-04-27T12:00:00+02:00"),
+            peak_power=604,
+        ),
+    ]
+    assert forecast.day_production(date(2024, 4, 28)) == 0
+    assert forecast.peak_production_time(date(2024, 4, 28)) is None
+
+
+@pytest.mark.freeze_time("2024-04-26T12:00:00+02:00")
+def test_estimate_snapshot() -> None:
+    """Test all summary metrics are evaluated against a single moment."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+
+    assert forecast.snapshot() == EstimateSnapshot(
+        at=forecast.now(),
+        power_production_now=773,
+        energy_current_hour=821,
+        energy_production_today=6660,
+        energy_production_today_remaining=4144,
+        energy_production_tomorrow=5338,
+        power_highest_peak_time_today=datetime.fromisoformat(
+            "2024-04-26T11:00:00+02:00"
+        ),
+        power_highest_peak_time_tomorrow=datetime.fromisoformat(
+            "2024-04-27T12:00:00+02:00"
+        ),
+    )
+
+    later = forecast.snapshot(datetime.fromisoformat("2024-04-26T22:30:00+00:00"))
+    assert later.at.isoformat() == "2024-04-27T00:30:00+02:00"
+    assert later.energy_production_today == 5338
+    assert later.energy_production_tomorrow == 0
+    assert later.power_highest_peak_time_tomorrow is None
+
+
+@pytest.mark.parametrize("method", ["step", "linear"])
+def test_estimate_sample(method: SampleMethod) -> None:
+    """Test sampling power and energy on a regular grid."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    start = datetime.fromisoformat("2024-04-26T00:00:00+02:00")
+
+    sample = forecast.sample(
+        start, start + timedelta(days=2), timedelta(minutes=5), method
+    )
+
+    assert len(sample.timestamps) == len(sample.power) == len(sample.energy) == 576
+    assert sample.timestamps[0] == start
+    assert sample.timestamps[-1] == start + timedelta(hours=47, minutes=55)
+    assert sample.power[144] == 773
+    assert sum(sample.energy[:288]) == pytest.approx(6660, rel=0.01)
+    assert sum(sample.energy[288:]) == pytest.approx(5338, rel=0.01)
+
+    hourly = forecast.sample(start, start + timedelta(days=2), timedelta(hours=1))
+    assert hourly.power == [
+        forecast.power_production_at_time(moment) for moment in hourly.timestamps
+    ]
+
+
+def test_estimate_sample_linear_interpolation() -> None:
+    """Test linear sampling interpolates between the power values."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    start = datetime.fromisoformat("2024-04-26T12:00:00+02:00")
+
+    sample = forecast.sample(
+        start, start + timedelta(hours=1), timedelta(minutes=30), "linear"
+    )
+
+    assert sample.power == [773, 741.5]
+    assert sample.energy == pytest.approx([(773 + 741.5) / 4, (741.5 + 710) / 4])
+
+
+def test_estimate_sample_invalid_arguments() -> None:
+    """Test sampling rejects invalid grids and methods."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    start = datetime.fromisoformat("2024-04-26T12:00:00+02:00")
+
+    with pytest.raises(ValueError, match="timezone aware"):
+        forecast.sample(start.replace(tzinfo=None), start, timedelta(hours=1))
+    with pytest.raises(ValueError, match="positive"):
+        forecast.sample(start, start + timedelta(hours=1), timedelta(0))
+    with pytest.raises(ValueError, match="Unknown sample method"):
+        forecast.sample(start, start, timedelta(hours=1), "cubic")  # ty: ignore[invalid-argument-type]
+
+    assert forecast.sample(start, start, timedelta(hours=1)).timestamps == []
+
+
+@pytest.mark.parametrize("method", ["step", "linear"])
+def test_estimate_sample_numpy(method: SampleMethod) -> None:
+    """Test the NumPy sampler matches the pure Python sampler."""
+    np = pytest.importorskip("numpy")
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    start = datetime.fromisoformat("2024-04-25T22:00:00+02:00")
+    end = start + timedelta(days=3)
+
+    timestamps, power, energy = forecast.sample_numpy(
+        start, end, timedelta(minutes=7), method
+    )
+    sample = forecast.sample(start, end, timedelta(minutes=7), method)
+
+    assert timestamps.tolist() == [
+        int(moment.timestamp()) for moment in sample.timestamps
+    ]
+    assert np.allclose(power, sample.power)
+    assert np.allclose(energy, sample.energy)
+
+    empty = Estimate(
+        watts={}, wh_period={}, wh_days={}, api_rate_limit=10, api_timezone="UTC"
+    )
+    _, power, energy = empty.sample_numpy(start, end, timedelta(hours=1), method)
+    assert power.tolist() == energy.tolist() == [0.0] * 72
+
+
+def test_estimate_to_numpy() -> None:
+    """Test exporting the series as NumPy arrays."""
+    np = pytest.importorskip("numpy")
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+
+    timestamps, values = forecast.to_numpy()
+    assert timestamps.dtype == values.dtype == np.int64
+    assert timestamps.tolist() == [int(moment.timestamp()) for moment in forecast.watts]
+    assert values.tolist() == list(forecast.watts.values())
+    assert not values.flags.writeable
+
+    timestamps, values = forecast.to_numpy("wh_days")
+    assert timestamps.tolist() == [
+        int(day.replace(tzinfo=UTC).timestamp()) for day in forecast.wh_days
+    ]
+    assert values.tolist() == list(forecast.wh_days.values())
+
+    with pytest.raises(ValueError, match="Unknown series"):
+        forecast.to_numpy("watt_hours")  # ty: ignore[invalid-argument-type]
+
+
+def test_estimate_to_arrow() -> None:
+    """Test exporting the series as an Arrow table."""
+    pa = pytest.importorskip("pyarrow")
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+
+    table = forecast.to_arrow("wh_period")
+    assert table.column_names == ["timestamp", "value"]
+    assert table.schema.field("timestamp").type == pa.timestamp("s", tz="UTC")
+    assert table.column("timestamp").to_pylist() == [
+        moment.astimezone(UTC) for moment in forecast.wh_period
+    ]
+    assert table.column("value").to_pylist() == list(forecast.wh_period.values())
+
+    days = forecast.to_arrow("wh_days")
+    assert days.schema.field("timestamp").type == pa.timestamp("s")
+    assert days.column("timestamp").to_pylist() == list(forecast.wh_days)
+
+
+def test_estimate_stack_numpy() -> None:
+    """Test stacking the series of many estimates on a common time axis."""
+    np = pytest.importorskip("numpy")
+    first = Estimate(
+        watts={
+            datetime(2024, 4, 26, 10, tzinfo=UTC): 1,
+            datetime(2024, 4, 26, 11, tzinfo=UTC): 2,
+        },
+        wh_period={},
+        wh_days={},
+        api_rate_limit=12,
+        api_timezone="UTC",
+    )
+    second = Estimate(
+        watts={
+            datetime(2024, 4, 26, 11, tzinfo=UTC): 3,
+            datetime(2024, 4, 26, 12, tzinfo=UTC): 4,
+        },
+        wh_period={},
+        wh_days={},
+        api_rate_limit=12,
+        api_timezone="UTC",
+    )
+
+    timestamps, values = Estimate.stack_numpy([first, second])
+    assert timestamps.tolist() == [1714125600, 1714129200, 1714132800]
+    assert np.array_equal(values, [[1, 2, np.nan], [np.nan, 3, 4]], equal_nan=True)
+
+    timestamps, values = Estimate.stack_numpy([])
+    assert timestamps.shape == (0,)
+    assert values.shape == (0, 0)
+
+
+@pytest.mark.freeze_time("2024-04-27T07:00:00+02:00")
+async def test_estimated_forecast_lazy(
+    aresponses: ResponsesMockServer,
+    forecast_key_client: ForecastSolar,
+) -> None:
+    """Test a lazily parsed estimate of the client equals an eager one."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/myapikey/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "60",
+                "X-Ratelimit-Period": "3600",
+            },
+            text=load_fixtures("forecast_personal.json"),
+        ),
+    )
+    forecast = await forecast_key_client.estimate(actual=2.300, lazy=True)
+
+    assert forecast._watts._raw is not None
+    assert forecast.energy_production_today == 5788
+    assert forecast.sum_energy_production(6) == 2802
+    assert forecast == Estimate.from_dict(
+        json.loads(load_fixtures("forecast_personal.json"))
+    )
+
+
+@pytest.mark.freeze_time("2024-04-27T07:00:00+02:00")
+def test_estimate_lazy_parsing() -> None:
+    """Test lazily parsed estimates only decode the series that are used."""
+    data = json.loads(load_fixtures("forecast_personal.json"))
+    forecast = Estimate.from_dict(data, lazy=True)
+
+    assert forecast.energy_production_today == 5788
+    assert forecast._wh_days._raw is None
+    assert forecast._watts._raw is not None
+    assert forecast._wh_period._raw is not None
+
+    assert forecast == Estimate.from_dict(data)
+    assert forecast._watts._raw is None
+
+
+def test_estimate_timestamp_formats() -> None:
+    """Test decoding timestamps outside the fast path, and unsorted series."""
+    forecast = Estimate.from_dict(
+        {
+            "result": {
+                "watts": {
+                    "2024-04-26T12:00:00Z": 3,
+                    "2024-04-26 11:00:00+00:00": 2,
+                    "2024-04-26T12:00:00+02:00": 1,
+                },
+                "watt_hours_period": {
+                    "20240426T120000+0200": 1,
+                    "2024-04-26T11:00:00+00:00": 2,
+                },
+                "watt_hours_day": {"2024-04-26": 10},
+            },
+            "message": {
+                "ratelimit": {"limit": 10},
+                "info": {"timezone": "UTC"},
+            },
+        }
+    )
+
+    assert list(forecast.watts.items()) == [
+        (datetime.fromisoformat("2024-04-26T12:00:00+02:00"), 1),
+        (datetime.fromisoformat("2024-04-26T11:00:00+00:00"), 2),
+        (datetime.fromisoformat("2024-04-26T12:00:00+00:00"), 3),
+    ]
+    assert list(forecast.wh_period.values()) == [1, 2]
+    assert forecast.day_production(date(2024, 4, 26)) == 10
+
+
+def test_estimate_float_values() -> None:
+    """Test values that are not integers are rounded, not rejected."""
+    moment = datetime(2024, 4, 26, 12, tzinfo=UTC)
+    forecast = Estimate(
+        watts={moment: 1.6},
+        wh_period={moment: 2.4},
+        wh_days={},
+        api_rate_limit=10,
+        api_timezone="UTC",
+    )
+    assert forecast.watts == {moment: 2}
+    assert forecast.wh_period == {moment: 2}
+
+    data = json.loads(load_fixtures("forecast.json"))
+    data["result"]["watts"] = {
+        key: value + 0.4 for key, value in data["result"]["watts"].items()
+    }
+    streamed = StreamDecoder()
+    streamed.feed(json.dumps(data).encode())
+    expected = Estimate.from_dict(json.loads(load_fixtures("forecast.json")))
+    assert Estimate.from_dict(data) == expected
+    assert Estimate.from_dict(streamed.close()) == expected
+
+
+def test_timestamp_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the shared timestamp cache is cleared when it outgrows its bound."""
+    data = json.loads(load_fixtures("forecast.json"))
+    monkeypatch.setattr(models, "_CACHE_SIZE", 10)
+
+    Estimate.from_dict(data)
+    Estimate.from_dict(data)
+    assert len(models._KEYS) <= len(data["result"]["watts"])
+    assert Estimate.from_dict(data) == Estimate.from_dict(data, lazy=True)
+
+
+@pytest.mark.parametrize("fixture", ["forecast.json", "forecast_personal.json"])
+def test_estimate_transform_matches_api(fixture: str) -> None:
+    """Test the energy is integrated from the power like the API does."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures(fixture)))
+
+    assert forecast.transform() == forecast
+
+
+def test_estimate_transform() -> None:
+    """Test damping and inverter clipping."""
+    forecast = Estimate.from_dict(json.loads(load_fixtures("forecast_personal.json")))
+    day = [item for item in forecast.watts.items() if item[0].day == 27]
+    (first, _), (second, power), *_, (last, _) = day
+    half = (last - first) / 2
+
+    damped = forecast.transform(damping_morning=0.5, damping_evening=1)
+    midday = datetime.fromisoformat("2024-04-27T13:30:00+02:00")
+    assert damped.watts[midday] == round(
+        forecast.watts[midday] * (1 - 0.5 * (1 - (midday - first) / half))
+    )
+    assert damped.watts[second] == round(power * (0.5 + 0.5 * (second - first) / half))
+    assert damped.watts[last] == 0
+    day_27 = date(2024, 4, 27)
+    assert damped.day_production(day_27) < forecast.day_production(day_27)
+
+    clipped = forecast.transform(inverter=0.5)
+    assert max(clipped.watts.values()) == 500
+    assert clipped.wh_days == {
+        day: sum(
+            energy
+            for moment, energy in clipped.wh_period.items()
+            if moment.date() == day.date()
+        )
+        for day in forecast.wh_days
+    }
+    assert clipped.transform(inverter=0.5) == clipped
+
+    with pytest.raises(ValueError, match="Damping"):
+        forecast.transform(damping_morning=1.5)
+
+
+def test_estimate_transform_utc() -> None:
+    """Test days are those of the site when the timestamps are in UTC."""
+    # 07:00 until 17:00 in Sydney, which is 21:00 until 07:00 in UTC
+    start = datetime(2024, 6, 20, 21, tzinfo=UTC)
+    watts = {start + timedelta(hours=hour): 1000 for hour in range(11)}
+    day = datetime.fromisoformat("2024-06-21")
+    forecast = Estimate(
+        watts=watts,
+        wh_period=dict.fromkeys(watts, 1000),
+        wh_days={day: 10000},
+        api_rate_limit=12,
+        api_timezone="Australia/Sydney",
+    )
+
+    damped = forecast.transform(damping_morning=1)
+
+    # The morning damping fades out at 12:00 in Sydney, not in UTC
+    assert list(damped.watts.values()) == [0, 200, 400, 600, 800, *[1000] * 6]
+    assert damped.wh_days == {day: 7500}
+    assert forecast.transform().wh_days == forecast.wh_days
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_estimate_scaled(*, lazy: bool) -> None:
+    """Test scaling every value of an estimate."""
+    forecast = Estimate.from_dict(
+        json.loads(load_fixtures("forecast_personal.json")), lazy=lazy
+    )
+
+    scaled = forecast.scaled(2.5)
+    assert list(scaled.watts) == list(forecast.watts)
+    assert list(scaled.watts.values()) == [
+        round(value * 2.5) for value in forecast.watts.values()
+    ]
+    assert list(scaled.wh_period.values()) == [
+        round(value * 2.5) for value in forecast.wh_period.values()
+    ]
+    assert scaled.wh_days == {
+        day: round(value * 2.5) for day, value in forecast.wh_days.items()
+    }
+    assert scaled.api_timezone == forecast.api_timezone
+    assert forecast.scaled(1) == forecast
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("fixture", ["forecast.json", "forecast_personal.json"])
+def test_estimate_to_dict(fixture: str, *, lazy: bool) -> None:
+    """Test an estimate converts back to an API response."""
+    data = json.loads(load_fixtures(fixture))
+    estimate = Estimate.from_dict(data, lazy=lazy)
+
+    result = estimate.to_dict()
+    assert result["result"]["watts"] == data["result"]["watts"]
+    assert result["result"]["watt_hours_day"] == data["result"]["watt_hours_day"]
+    assert Estimate.from_dict(result) == estimate
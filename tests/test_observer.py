@@ -0,0 +1,106 @@
+"""Test the request instrumentation."""
+
+# pylint: disable=protected-access
+
+import asyncio
+
+import pytest
+from aresponses import ResponsesMockServer
+
+from forecast_solar import (
+    ForecastSolar,
+    MetricsAggregator,
+    RequestMetrics,
+    RetryPolicy,
+)
+from forecast_solar.observer import Histogram
+
+from . import add_estimate, load_fixtures
+
+ESTIMATE_TEMPLATE = "estimate/{latitude}/{longitude}/{planes}"
+
+
+async def test_observe_estimate(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test the measurements of an estimate request."""
+    reported: list[RequestMetrics] = []
+
+    class Observer:
+        def on_request(self, metrics: RequestMetrics) -> None:
+            reported.append(metrics)
+
+    add_estimate(aresponses)
+    forecast_client.observer = Observer()
+    await forecast_client.estimate()
+
+    assert len(reported) == 1
+    metrics = reported[0]
+    assert metrics.url_template == ESTIMATE_TEMPLATE
+    assert metrics.status == 200
+    assert metrics.bytes_received == len(load_fixtures("forecast.json").encode())
+    assert metrics.ratelimit_remaining == 10
+    assert metrics.error is None
+    assert metrics.headers_time > 0
+    assert metrics.decode_time > 0
+    assert metrics.build_time > 0
+
+
+async def test_metrics_aggregator(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test failed attempts and coalesced requests are counted once."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(status=503, text="Service Unavailable"),
+    )
+    add_estimate(aresponses)
+    aggregator = MetricsAggregator()
+    forecast_client.observer = aggregator
+    forecast_client.retry = RetryPolicy(backoff=0)
+
+    await asyncio.gather(forecast_client.estimate(), forecast_client.estimate())
+
+    stats = aggregator.stats[ESTIMATE_TEMPLATE]
+    assert stats.requests == 2
+    assert stats.statuses == {503: 1, 200: 1}
+    assert stats.errors == {"ForecastSolarConnectionError": 1}
+    assert stats.ratelimit_remaining == 10
+    assert stats.headers_time.count == 2
+    assert stats.build_time.count == 1
+    aresponses.assert_all_requests_matched()
+
+
+async def test_observe_build_error(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test an error while building the model is reported."""
+    add_estimate(aresponses, fixture="validate_key.json")
+    aggregator = MetricsAggregator()
+    forecast_client.observer = aggregator
+
+    with pytest.raises(KeyError):
+        await forecast_client.estimate()
+
+    stats = aggregator.stats[ESTIMATE_TEMPLATE]
+    assert stats.errors == {"KeyError": 1}
+    assert stats.build_time.count == 0
+
+
+def test_histogram() -> None:
+    """Test the histogram buckets and quantiles."""
+    histogram = Histogram(buckets=(0.1, 1))
+    assert histogram.quantile(0.5) == 0
+    for duration in (0.05, 0.5, 0.5, 5):
+        histogram.add(duration)
+
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.mean == pytest.approx(1.5125)
+    assert histogram.quantile(0.25) == 0.1
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(1) == float("inf")
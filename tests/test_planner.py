@@ -0,0 +1,111 @@
+"""Test planning refreshes of many sites within one rate limit."""
+
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
+
+import pytest
+
+from forecast_solar import PlannedRefresh, Ratelimit, RefreshPlanner
+
+START = datetime(2024, 6, 21, 8, 0, tzinfo=UTC)
+
+
+def test_priority_sets_refresh_rate() -> None:
+    """Test sites are refreshed in proportion to their priority."""
+    planner = RefreshPlanner(call_limit=60, period=3600)
+    planner.add("home", priority=2)
+    planner.add("shed")
+
+    refreshes = planner.plan(START + timedelta(hours=4), START)
+
+    # Never refreshed sites go first, the heaviest first
+    assert refreshes[:2] == [
+        PlannedRefresh("home", START),
+        PlannedRefresh("shed", START + timedelta(minutes=1)),
+    ]
+    assert Counter(refresh.key for refresh in refreshes) == {"home": 8, "shed": 5}
+    assert refreshes[2] == PlannedRefresh("home", START + timedelta(minutes=30))
+
+
+def test_plan_stays_within_ratelimit() -> None:
+    """Test an overloaded key refreshes all sites without exceeding the limit."""
+    planner = RefreshPlanner(call_limit=60, period=3600)
+    for site in range(500):
+        planner.add(site, max_age=timedelta(minutes=15), priority=1 + site % 3)
+
+    refreshes = planner.plan(START + timedelta(hours=48), START)
+    moments = [refresh.at for refresh in refreshes]
+
+    assert len(refreshes) == 2881
+    assert all(
+        later - earlier == timedelta(minutes=1) for earlier, later in pairwise(moments)
+    )
+    counts = Counter(refresh.key for refresh in refreshes)
+    assert len(counts) == len(planner)
+    # Sites are refreshed in proportion to their priority
+    assert (counts[0], counts[1]) == (3, 6)
+    assert counts[2] >= 8
+
+
+def test_observed_ratelimit() -> None:
+    """Test the remaining calls of a response are never exceeded."""
+    planner = RefreshPlanner()
+    for site in "abc":
+        planner.add(site, max_age=timedelta(seconds=1))
+    retry_at = START + timedelta(minutes=30)
+
+    planner.observe(Ratelimit(60, 0, 3600, retry_at), START)
+    assert planner.next(START) == PlannedRefresh("a", retry_at)
+
+    planner.observe(Ratelimit(60, 1, 3600, None), retry_at)
+    assert planner.next(retry_at) == PlannedRefresh(
+        "b", retry_at + timedelta(minutes=1)
+    )
+    # The window of the response ends a period after it
+    assert planner.next(retry_at) == PlannedRefresh("c", retry_at + timedelta(hours=1))
+    assert planner.call_limit == 60
+
+
+def test_activity() -> None:
+    """Test sites without solar activity are not refreshed."""
+    planner = RefreshPlanner(call_limit=60, period=3600)
+    planner.add("home", activity=0)
+    assert planner.next(START) is None
+
+    planner.update("home", activity=1, refreshed_at=START)
+    assert planner.next(START) == PlannedRefresh("home", START + timedelta(hours=1))
+
+    planner.update("home", activity=0.5, priority=2)
+    assert planner.next(START) == PlannedRefresh("home", START + timedelta(hours=2))
+
+
+def test_add_and_remove() -> None:
+    """Test replacing and removing sites."""
+    planner = RefreshPlanner()
+    planner.add("home")
+    planner.remove("home")
+    assert "home" not in planner
+    assert planner.next(START) is None
+
+    planner.add("home", refreshed_at=START)
+    planner.add("home", max_age=timedelta(minutes=10), refreshed_at=START)
+    assert len(planner) == 1
+    assert planner.plan(START + timedelta(minutes=20), START) == [
+        PlannedRefresh("home", START + timedelta(minutes=10)),
+        PlannedRefresh("home", START + timedelta(minutes=20)),
+    ]
+
+
+def test_invalid_weights() -> None:
+    """Test invalid configurations and weights are rejected."""
+    with pytest.raises(ValueError, match="call_limit and period"):
+        RefreshPlanner(call_limit=0)
+    planner = RefreshPlanner()
+    with pytest.raises(ValueError, match="max_age and priority"):
+        planner.add("home", max_age=timedelta(0))
+    planner.add("home")
+    with pytest.raises(ValueError, match="activity at least 0"):
+        planner.update("home", activity=-1)
+    with pytest.raises(KeyError):
+        planner.update("shed", priority=1)
@@ -0,0 +1,237 @@
+"""Test retries and the circuit breaker."""
+
+# pylint: disable=protected-access
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import ClientResponseError, RequestInfo, web
+from aresponses import ResponsesMockServer
+from yarl import URL
+
+from forecast_solar import (
+    CircuitBreaker,
+    ForecastSolar,
+    ForecastSolarCircuitOpenError,
+    ForecastSolarConnectionError,
+    ForecastSolarRatelimitError,
+    ForecastSolarRequestError,
+    RetryPolicy,
+)
+from forecast_solar.forecast_solar import _IN_FLIGHT
+
+from . import load_fixtures
+
+
+def add_response(aresponses: ResponsesMockServer, status: int, repeat: int = 1) -> None:
+    """Add a response for the test endpoint."""
+    fixtures = {200: "validate_key.json", 429: "ratelimit.json"}
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(
+            status=status,
+            headers={"Content-Type": "application/json"},
+            text=load_fixtures(fixtures.get(status, "forecast.json")),
+        ),
+        repeat=repeat,
+    )
+
+
+async def test_transient_error_is_retried(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a request is sent again after a transient error."""
+    add_response(aresponses, 503)
+    add_response(aresponses, 502)
+    add_response(aresponses, 200)
+    forecast_client.retry = RetryPolicy(backoff=0)
+
+    assert await forecast_client._request("test", rate_limit=False)
+    aresponses.assert_all_requests_matched()
+
+
+async def test_retries_are_limited(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test the error is raised once all attempts failed."""
+    add_response(aresponses, 503, repeat=2)
+    forecast_client.retry = RetryPolicy(max_attempts=2, backoff=0)
+
+    with pytest.raises(ForecastSolarConnectionError):
+        await forecast_client._request("test", rate_limit=False)
+    aresponses.assert_all_requests_matched()
+
+
+async def test_request_error_is_not_retried(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test errors caused by the request are raised right away."""
+    add_response(aresponses, 400)
+    forecast_client.retry = RetryPolicy(backoff=0)
+
+    with pytest.raises(ForecastSolarRequestError):
+        await forecast_client._request("test", rate_limit=False)
+    aresponses.assert_all_requests_matched()
+
+
+async def test_ratelimit_is_retried_at_reset(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a rate limited request is retried once the rate limit reset."""
+    add_response(aresponses, 429)
+    add_response(aresponses, 200)
+    forecast_client.retry = RetryPolicy()
+
+    # The reset moment of the fixture has passed
+    assert await forecast_client._request("test", rate_limit=False)
+    aresponses.assert_all_requests_matched()
+
+
+@pytest.mark.freeze_time("2024-04-27T02:00:00+02:00")
+async def test_ratelimit_reset_after_deadline(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a rate limit reset after the deadline is not waited for."""
+    add_response(aresponses, 429)
+    forecast_client.retry = RetryPolicy(deadline=60)
+
+    with pytest.raises(ForecastSolarRatelimitError):
+        await forecast_client._request("test", rate_limit=False)
+
+
+async def test_circuit_breaker(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test requests are not sent while the circuit is open."""
+    add_response(aresponses, 503, repeat=2)
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=3600)
+    forecast_client.circuit_breaker = breaker
+    forecast_client.retry = RetryPolicy(backoff=0)
+
+    with pytest.raises(ForecastSolarCircuitOpenError):
+        await forecast_client._request("test", rate_limit=False)
+    assert breaker.state == "open"
+    assert breaker.failures == 2
+    aresponses.assert_all_requests_matched()
+
+
+async def test_circuit_breaker_recovery(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a trial request closes the circuit when it succeeds."""
+    add_response(aresponses, 503)
+    add_response(aresponses, 400)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    forecast_client.circuit_breaker = breaker
+
+    with pytest.raises(ForecastSolarConnectionError):
+        await forecast_client._request("test", rate_limit=False)
+    assert breaker.state == "half-open"
+
+    breaker.check()
+    assert breaker.state == "open"
+    with pytest.raises(ForecastSolarCircuitOpenError):
+        breaker.check()
+    breaker.record_failure()
+
+    # The API responded, even though the request itself was invalid
+    with pytest.raises(ForecastSolarRequestError):
+        await forecast_client._request("test", rate_limit=False)
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+async def test_circuit_breaker_unexpected_trial_error(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a trial request never leaves the circuit stuck open."""
+    add_response(aresponses, 503)
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(
+            status=200, headers={"Content-Type": "application/json"}, text="{not json"
+        ),
+    )
+    add_response(aresponses, 200)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    forecast_client.circuit_breaker = breaker
+
+    with pytest.raises(ForecastSolarConnectionError):
+        await forecast_client._request("test", rate_limit=False)
+    with pytest.raises(json.JSONDecodeError):
+        await forecast_client._request("test", rate_limit=False)
+    assert breaker.state == "closed"
+
+    await forecast_client._request("test", rate_limit=False)
+    aresponses.assert_all_requests_matched()
+
+
+async def test_circuit_breaker_cancelled_trial(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a cancelled trial request lets the next request through."""
+
+    async def slow_response(_: web.BaseRequest) -> web.Response:
+        await asyncio.sleep(10)
+        return aresponses.Response(status=200)  # pragma: no cover
+
+    aresponses.add("api.forecast.solar", "/test", "GET", slow_response)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    breaker.record_failure()
+    forecast_client.circuit_breaker = breaker
+
+    task = asyncio.create_task(forecast_client._request("test", rate_limit=False))
+    await asyncio.sleep(0.1)
+    assert breaker.state == "open"
+    assert forecast_client.session is not None
+    # Cancel the request itself, not only the caller waiting for it
+    for request in _IN_FLIGHT[forecast_client.session].values():
+        request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert breaker.state == "half-open"
+
+
+def test_retry_delay() -> None:
+    """Test the backoff of the retry policy."""
+    policy = RetryPolicy(
+        max_attempts=5, backoff=1, max_backoff=3, jitter=False, deadline=10
+    )
+    error = ForecastSolarConnectionError()
+
+    assert [policy.delay(attempt, error, 0) for attempt in range(1, 6)] == [
+        1,
+        2,
+        3,
+        3,
+        None,
+    ]
+    assert policy.delay(1, error, 9.5) is None
+    assert policy.delay(1, ValueError(), 0) is None
+
+    request_info = RequestInfo(URL("https://api.forecast.solar"), "GET", {})  # ty: ignore[invalid-argument-type]
+    server_error = ClientResponseError(request_info, (), status=500)
+    assert policy.delay(1, server_error, 0) == 1
+
+    jittered = RetryPolicy(backoff=1)
+    assert 0 <= (jittered.delay(2, error, 0) or 0) <= 2
+
+
+def test_invalid_retry_policy() -> None:
+    """Test the retry policy is validated."""
+    with pytest.raises(ValueError, match="max_attempts"):
+        RetryPolicy(max_attempts=0)
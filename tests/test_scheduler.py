@@ -0,0 +1,95 @@
+"""Test the rate limit scheduler."""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from aresponses import ResponsesMockServer
+
+from forecast_solar import Estimate, ForecastSolar, Ratelimit, RatelimitScheduler
+
+from . import load_fixtures
+
+
+async def test_requests_are_paced() -> None:
+    """Test requests are spread evenly over the period."""
+    scheduler = RatelimitScheduler(call_limit=20, period=1)
+
+    start = time.monotonic()
+    await asyncio.gather(*(scheduler.acquire("myapikey") for _ in range(3)))
+
+    # The first request is sent right away, the others 50 ms apart
+    assert time.monotonic() - start >= 0.09
+    assert scheduler.delay("myapikey") > 0
+    assert scheduler.delay(None) == 0
+
+
+async def test_update_from_ratelimit() -> None:
+    """Test the pacing follows the rate limit of the responses."""
+    scheduler = RatelimitScheduler(call_limit=1, period=3600)
+    await scheduler.acquire(None)
+    assert scheduler.delay(None) > 3000
+
+    scheduler.update(None, Ratelimit(100, 50, 1, None))
+    assert scheduler.delay(None) <= 0.01
+
+    retry_at = datetime.now(UTC) + timedelta(seconds=60)
+    scheduler.update(None, Ratelimit(100, 0, 1, retry_at))
+    assert 59 < scheduler.delay(None) <= 60
+
+
+async def test_ratelimited_request_is_retried(
+    aresponses: ResponsesMockServer,
+) -> None:
+    """Test a rate limited request is held and sent again."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=429,
+            headers={"Content-Type": "application/json"},
+            text=load_fixtures("ratelimit.json"),
+        ),
+    )
+    aresponses.add(
+        "api.forecast.solar",
+        "/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "1000",
+                "X-Ratelimit-Period": "1",
+                "X-Ratelimit-Remaining": "999",
+            },
+            text=load_fixtures("forecast.json"),
+        ),
+    )
+
+    scheduler = RatelimitScheduler(call_limit=1000, period=1)
+    async with ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        scheduler=scheduler,
+    ) as forecast:
+        estimate = await forecast.estimate()
+
+    assert isinstance(estimate, Estimate)
+    assert forecast.ratelimit is not None
+    assert forecast.ratelimit.remaining_calls == 999
+    aresponses.assert_all_requests_matched()
+
+
+@pytest.mark.parametrize(
+    ("call_limit", "period", "burst"), [(0, 3600, 1), (12, 0, 1), (12, 3600, 0)]
+)
+async def test_invalid_scheduler(call_limit: int, period: int, burst: int) -> None:
+    """Test the scheduler configuration is validated."""
+    with pytest.raises(ValueError, match="at least 1"):
+        RatelimitScheduler(call_limit=call_limit, period=period, burst=burst)
@@ -0,0 +1,239 @@
+"""Test the clear sky estimates."""
+
+from datetime import UTC, date, datetime, time, timedelta
+
+import pytest
+from aresponses import ResponsesMockServer
+
+from forecast_solar import (
+    ClearSkyEstimator,
+    Estimate,
+    EstimateCache,
+    ForecastSolar,
+    ForecastSolarConnectionError,
+    Plane,
+)
+from forecast_solar.solar import (
+    clear_sky_irradiance,
+    parse_horizon,
+    solar_position,
+    solar_timezone,
+)
+
+from . import load_fixtures
+
+SOUTH = Plane(declination=30, azimuth=0, kwp=1)
+
+
+@pytest.mark.parametrize(
+    ("moment", "latitude", "longitude", "elevation", "azimuth"),
+    [
+        # Solar noon in Leiden at the summer solstice
+        ("2024-06-21T11:41:00+00:00", 52.16, 4.47, 61.3, 0),
+        # Sunrise in Leiden at the equinox, about due east
+        ("2024-03-20T05:45:00+00:00", 52.16, 4.47, -0.83, -90),
+        # The sun is in the north at noon south of the equator
+        ("2024-06-21T02:00:00+00:00", -33.87, 151.21, 32.7, 180),
+    ],
+)
+def test_solar_position(
+    moment: str, latitude: float, longitude: float, elevation: float, azimuth: float
+) -> None:
+    """Test the position of the sun."""
+    timestamp = datetime.fromisoformat(moment).timestamp()
+    result = solar_position(timestamp, latitude, longitude)
+
+    assert result[0] == pytest.approx(elevation, abs=0.5)
+    assert abs((result[1] - azimuth + 180) % 360 - 180) < 2
+
+
+def test_clear_sky_irradiance() -> None:
+    """Test the irradiance rises with the elevation of the sun."""
+    assert clear_sky_irradiance(-5) == (0, 0, 0)
+    low, high = clear_sky_irradiance(10), clear_sky_irradiance(60)
+    assert all(value > 0 for value in low)
+    assert low[0] < high[0] < 1100
+    assert low[1] < high[1] < 1000
+
+
+@pytest.mark.parametrize(
+    ("longitude", "timezone"),
+    [(4.47, "Etc/GMT"), (15, "Etc/GMT-1"), (-74, "Etc/GMT+5"), (179, "Etc/GMT-12")],
+)
+def test_solar_timezone(longitude: float, timezone: str) -> None:
+    """Test the timezone closest to local solar time."""
+    assert solar_timezone(longitude) == timezone
+
+
+def test_parse_horizon() -> None:
+    """Test parsing a horizon profile."""
+    assert parse_horizon("0,10, 20.5") == (0, 10, 20.5)
+    with pytest.raises(ValueError, match="Invalid horizon"):
+        parse_horizon("0,north")
+    with pytest.raises(ValueError, match="Invalid horizon"):
+        parse_horizon("0,100")
+
+
+def test_clear_sky_estimate() -> None:
+    """Test the estimate follows the sun, like an API estimate."""
+    estimator = ClearSkyEstimator(
+        52.16, 4.47, [SOUTH], timezone="Europe/Amsterdam", step=timedelta(minutes=15)
+    )
+    estimate = estimator.estimate(date(2024, 6, 21), days=3)
+
+    assert estimate.synthetic
+    assert estimate.api_timezone == "Europe/Amsterdam"
+    assert [day.day for day in estimate.days()] == [
+        date(2024, 6, 21),
+        date(2024, 6, 22),
+        date(2024, 6, 23),
+    ]
+    assert estimate.transform() == estimate
+    watts = list(estimate.watts.items())
+    assert watts[0][1] == 0
+    assert watts[0][0].time() <= time(5, 30)
+    peak = max(estimate.watts.values())
+    assert 800 < peak < 1100
+    peak_time = estimate.peak_production_time(date(2024, 6, 21))
+    assert peak_time is not None
+    assert 13 <= peak_time.hour <= 14
+    assert 6000 < estimate.day_production(date(2024, 6, 21)) < 9000
+    assert estimator.estimate().synthetic
+
+
+def test_clear_sky_estimate_planes_and_horizon() -> None:
+    """Test the orientation of the planes and the horizon are respected."""
+    start = date(2024, 4, 26)
+    east = ClearSkyEstimator(52.16, 4.47, [Plane(30, -90, 1)]).estimate(start, 1)
+    west = ClearSkyEstimator(52.16, 4.47, [Plane(30, 90, 1)]).estimate(start, 1)
+    both = ClearSkyEstimator(
+        52.16, 4.47, [Plane(30, -90, 1), Plane(30, 90, 1)]
+    ).estimate(start, 1)
+    east_peak = east.peak_production_time(start)
+    west_peak = west.peak_production_time(start)
+    assert east_peak is not None
+    assert west_peak is not None
+    assert east_peak < west_peak
+    assert both.day_production(start) == pytest.approx(
+        east.day_production(start) + west.day_production(start), rel=0.01
+    )
+
+    shaded = ClearSkyEstimator(52.16, 4.47, [SOUTH], horizon="0,0,60,60,60,0")
+    assert shaded.estimate(start, 1).day_production(start) < (
+        ClearSkyEstimator(52.16, 4.47, [SOUTH]).estimate(start, 1).day_production(start)
+    )
+
+
+def test_clear_sky_polar_night() -> None:
+    """Test days without sun are left out."""
+    estimate = ClearSkyEstimator(78.22, 15.65, [SOUTH]).estimate(date(2024, 12, 21))
+
+    assert len(estimate.watts) == 0
+    assert len(estimate.wh_days) == 0
+
+
+def test_clear_sky_invalid_step() -> None:
+    """Test the step must be positive."""
+    with pytest.raises(ValueError, match="step"):
+        ClearSkyEstimator(52.16, 4.47, [SOUTH], step=timedelta(0))
+
+
+def test_synthetic_round_trip() -> None:
+    """Test the synthetic flag survives to_dict and shows in the repr."""
+    estimate = ClearSkyEstimator(52.16, 4.47, [SOUTH]).estimate(date(2024, 4, 26), 1)
+
+    assert Estimate.from_dict(estimate.to_dict()) == estimate
+    assert Estimate.from_dict(estimate.to_dict()).synthetic
+    assert repr(estimate).endswith("synthetic=True)")
+    assert estimate.scaled(2).synthetic
+
+
+@pytest.mark.freeze_time("2024-04-27T10:00:00+00:00")
+async def test_clear_sky_fallback(
+    aresponses: ResponsesMockServer, forecast_key_client: ForecastSolar
+) -> None:
+    """Test a clear sky estimate is returned when the API fails."""
+    for status in (503, 429):
+        aresponses.add(
+            "api.forecast.solar",
+            "/myapikey/estimate/52.16/4.47/20/10/2.16",
+            "GET",
+            aresponses.Response(
+                status=status,
+                headers={"Content-Type": "application/json"},
+                text=load_fixtures("ratelimit.json"),
+            ),
+        )
+    forecast_key_client.clear_sky_fallback = True
+    forecast_key_client.damping_morning = 0.5
+
+    for _ in range(2):
+        estimate = await forecast_key_client.estimate()
+        assert estimate.synthetic
+        assert [day.day for day in estimate.days()] == [
+            date(2024, 4, 27),
+            date(2024, 4, 28),
+        ]
+        assert max(estimate.watts.values()) == 1300
+        assert estimate == forecast_key_client.clear_sky_estimate()
+
+    forecast_key_client.clear_sky_fallback = False
+    aresponses.add(
+        "api.forecast.solar",
+        "/myapikey/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(status=503),
+    )
+    with pytest.raises(ForecastSolarConnectionError):
+        await forecast_key_client.estimate()
+
+
+async def test_clear_sky_fallback_prefers_cache(
+    aresponses: ResponsesMockServer, forecast_key_client: ForecastSolar
+) -> None:
+    """Test an expired cached estimate is returned before a clear sky one."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/myapikey/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={
+                "Content-Type": "application/json",
+                "X-Ratelimit-Limit": "12",
+                "X-Ratelimit-Period": "3600",
+                "X-Ratelimit-Remaining": "10",
+            },
+            text=load_fixtures("forecast.json"),
+        ),
+    )
+    aresponses.add(
+        "api.forecast.solar",
+        "/myapikey/estimate/52.16/4.47/20/10/2.16",
+        "GET",
+        aresponses.Response(status=503),
+    )
+    forecast_key_client.cache = EstimateCache(ttl=timedelta(0))
+    forecast_key_client.clear_sky_fallback = True
+
+    estimate = await forecast_key_client.estimate()
+    fallback = await forecast_key_client.estimate()
+
+    assert fallback is estimate
+    assert not fallback.synthetic
+    assert forecast_key_client.cache.stale_hits == 1
+    aresponses.assert_all_requests_matched()
+
+
+def test_clear_sky_estimate_of_client(
+    forecast_multi_plane_client: ForecastSolar,
+) -> None:
+    """Test the planes and damping of the client are used."""
+    start = datetime(2024, 4, 26, tzinfo=UTC).date()
+    estimate = forecast_multi_plane_client.clear_sky_estimate(start, 1)
+    single = ClearSkyEstimator(52.16, 4.47, [Plane(20, 10, 2.16)]).estimate(start, 1)
+
+    assert estimate.day_production(start) > single.day_production(start)
+    forecast_multi_plane_client.damping = 1
+    damped = forecast_multi_plane_client.clear_sky_estimate(start, 1)
+    assert damped.day_production(start) < estimate.day_production(start)
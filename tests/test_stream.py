@@ -0,0 +1,82 @@
+"""Test the incremental decoding of JSON responses."""
+
+import json
+
+import pytest
+
+from forecast_solar import Estimate
+from forecast_solar._stream import StreamDecoder
+
+from . import load_fixtures
+
+
+def decode(document: bytes, chunk_size: int) -> object:
+    """Decode a document fed in chunks of a fixed size."""
+    decoder = StreamDecoder()
+    for position in range(0, len(document), chunk_size):
+        decoder.feed(document[position : position + chunk_size])
+    assert decoder.bytes_received == len(document)
+    return decoder.close()
+
+
+@pytest.mark.parametrize("fixture", ["forecast.json", "forecast_personal.json"])
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_decode_estimate(fixture: str, chunk_size: int) -> None:
+    """Test the series of an estimate are decoded into columns."""
+    body = load_fixtures(fixture).encode()
+    data = decode(body, chunk_size)
+    expected = json.loads(body)
+
+    assert isinstance(data, dict)
+    assert data["message"] == expected["message"]
+    assert Estimate.from_dict(data) == Estimate.from_dict(expected)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        '[1, -2.5, 3e2, "a\\"b", "\\u00e9t\\u00e9", true, false, null, {}, []]',
+        '{"nested": {"list": [{"a": 1}, [0]]}, "empty": ""}',
+        '"café"',
+        " 42 ",
+    ],
+)
+def test_decode_json(document: str) -> None:
+    """Test other documents decode like json.loads."""
+    assert decode(document.encode(), 1) == json.loads(document)
+
+
+def test_decode_series_fallback() -> None:
+    """Test series entries outside the fast path."""
+    data = decode(
+        b'{"result": {"watts": {}, "watt_hours_day": {'
+        b'"2024-04-26T12:00:00+02:00": 1, "20240426T130000Z" : 2}}}',
+        3,
+    )
+
+    assert isinstance(data, dict)
+    watts = data["result"]["watts"]
+    assert len(watts) == 0
+    wh_days = data["result"]["watt_hours_day"]
+    assert wh_days.timestamps.tolist() == [1714125600, 1714136400]
+    assert wh_days.values.tolist() == [1, 2]
+
+
+@pytest.mark.parametrize(
+    ("document", "message"),
+    [
+        ('{"a" 1}', "Expecting colon"),
+        ("[1,]", "Expecting value"),
+        ('{"a": 1,}', "Expecting key"),
+        ("{,}", "Expecting key or end of object"),
+        ("[}", "Expecting value or end of array"),
+        ("[1 2]", "Expecting comma or end of container"),
+        ("[1] 2", "Expecting end of data"),
+        ('{"a": 1', "Expecting comma or end of container"),
+        ("nul", "Invalid token"),
+    ],
+)
+def test_decode_invalid(document: str, message: str) -> None:
+    """Test invalid documents raise a decode error."""
+    with pytest.raises(json.JSONDecodeError, match=message):
+        decode(document.encode(), 2)
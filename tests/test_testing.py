@@ -0,0 +1,102 @@
+"""Test the Forecast.Solar API simulator."""
+
+# pylint: disable=protected-access
+
+from datetime import UTC, datetime
+
+import pytest
+
+from forecast_solar import (
+    ForecastSolar,
+    ForecastSolarConnectionError,
+    ForecastSolarError,
+    ForecastSolarRatelimitError,
+    ForecastSolarRequestError,
+    Plane,
+    RetryPolicy,
+)
+from forecast_solar.testing import Fault, ForecastSolarSimulator
+
+
+def client(simulator: ForecastSolarSimulator, **kwargs: object) -> ForecastSolar:
+    """Return a client for the simulator."""
+    return ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        base_url=simulator.url,
+        **kwargs,  # ty: ignore[invalid-argument-type]
+    )
+
+
+async def test_simulator_routes() -> None:
+    """Test the estimate, check and info routes."""
+    async with (
+        ForecastSolarSimulator(days=3, call_limit=60) as simulator,
+        client(
+            simulator,
+            api_key="myapikey",
+            planes=[Plane(declination=30, azimuth=-90, kwp=1.5)],
+        ) as forecast,
+    ):
+        estimate = await forecast.estimate()
+        assert await forecast.validate_plane()
+        assert await forecast.validate_api_key()
+
+    assert len(estimate.wh_days) == 3
+    assert len(estimate.watts) == 72
+    assert max(estimate.watts.values()) > 2000
+    assert forecast.ratelimit is not None
+    assert forecast.ratelimit.call_limit == 60
+    assert forecast.ratelimit.remaining_calls == 59
+    assert simulator.requests == {"estimate": 1, "check": 1, "info": 1}
+
+
+async def test_simulator_ratelimit() -> None:
+    """Test the simulator keeps a rate limit."""
+    async with (
+        ForecastSolarSimulator(call_limit=1) as simulator,
+        client(simulator) as forecast,
+    ):
+        await forecast.estimate()
+        with pytest.raises(ForecastSolarRatelimitError) as excinfo:
+            await forecast.estimate()
+
+    assert excinfo.value.reset_at > datetime.now(UTC)
+
+
+async def test_simulator_faults() -> None:
+    """Test injected faults are returned in order."""
+    async with (
+        ForecastSolarSimulator() as simulator,
+        client(simulator, retry=RetryPolicy(backoff=0)) as forecast,
+    ):
+        simulator.inject(Fault(503), Fault(429))
+        await forecast.estimate()
+        assert simulator.requests["estimate"] == 3
+
+        simulator.inject(Fault(200, content_type="text/html", body="<html>"))
+        with pytest.raises(ForecastSolarError, match="Unexpected response"):
+            await forecast.estimate()
+
+        with pytest.raises(ForecastSolarRequestError):
+            await forecast._request("unknown")
+
+
+async def test_simulator_error_rate() -> None:
+    """Test random faults are injected at the error rate."""
+    async with (
+        ForecastSolarSimulator(error_rate=1, seed=1) as simulator,
+        client(simulator) as forecast,
+    ):
+        with pytest.raises(ForecastSolarConnectionError):
+            await forecast.estimate()
+
+
+async def test_simulator_not_running() -> None:
+    """Test the URL is only known while the simulator runs."""
+    simulator = ForecastSolarSimulator()
+    with pytest.raises(RuntimeError):
+        assert simulator.url
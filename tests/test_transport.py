@@ -0,0 +1,87 @@
+"""Test the transport configuration."""
+
+# pylint: disable=protected-access
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aresponses import ResponsesMockServer
+
+from forecast_solar import ForecastSolar, ForecastSolarConnectionError, Transport
+
+from . import load_fixtures
+
+
+def forecast_solar(transport: Transport) -> ForecastSolar:
+    """Return a client that creates its own session."""
+    return ForecastSolar(
+        latitude=52.16,
+        longitude=4.47,
+        declination=20,
+        azimuth=10,
+        kwp=2.160,
+        transport=transport,
+    )
+
+
+async def test_internal_session(aresponses: ResponsesMockServer) -> None:
+    """Test the internal session follows the transport."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixtures("validate_key.json"),
+        ),
+    )
+    transport = Transport(total_timeout=5, limit=4, limit_per_host=2)
+
+    async with forecast_solar(transport) as forecast:
+        await forecast._request("test", rate_limit=False)
+        assert forecast.session is not None
+        assert forecast.session.timeout.total == 5
+        assert forecast.session.connector is not None
+        assert forecast.session.connector.limit == 4
+        assert forecast.session.connector.limit_per_host == 2
+
+    assert forecast.session.closed
+
+
+async def test_timeout(
+    aresponses: ResponsesMockServer,
+    forecast_client: ForecastSolar,
+) -> None:
+    """Test a request timeout, also on a shared session."""
+
+    async def response_handler(_: web.Request) -> web.Response:
+        await asyncio.sleep(1)
+        return aresponses.Response(body="Goodmorning!")
+
+    aresponses.add("api.forecast.solar", "/test", "GET", response_handler)
+    forecast_client.transport = Transport(total_timeout=0.05)
+
+    with pytest.raises(ForecastSolarConnectionError, match="Timeout"):
+        await forecast_client._request("test")
+
+
+async def test_connections_released_on_errors(
+    aresponses: ResponsesMockServer,
+) -> None:
+    """Test error responses do not keep connections from the pool."""
+    aresponses.add(
+        "api.forecast.solar",
+        "/test",
+        "GET",
+        aresponses.Response(status=503, text="Service Unavailable"),
+        repeat=3,
+    )
+    transport = Transport(connect_timeout=1, limit=1)
+
+    async with forecast_solar(transport) as forecast:
+        for _ in range(3):
+            with pytest.raises(ForecastSolarConnectionError, match="unreachable"):
+                await forecast._request("test")
+    aresponses.assert_all_requests_matched()